@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Compare the Babai and MITM-Babai success probabilities of hybrid attacks with their previous implementation.
+
+``PrimalHybrid.cost`` evaluates these probabilities for every candidate block size, guessing dimension and lattice
+dimension. They used to be computed with one Sage distribution or ``erf`` call per Gram-Schmidt norm, they are now
+computed with NumPy/SciPy from a log-domain profile. This reports both timings and the difference of the logarithms
+of the probabilities on GSA profiles of growing dimension.
+
+Run from the root of the repository::
+
+    python benchmarks/babai_probability.py --dimensions 1000 2000 4000 8000
+
+"""
+
+import argparse
+import time
+
+from sage.all import RR, RealDistribution, erf, exp, pi, prod, sqrt
+
+from estimator.nd import sigmaf
+from estimator.prob import log_babai, log_mitm_babai_probability
+from estimator.simulator import GSA, log_profile
+
+
+def reference_babai(r, norm):
+    """
+    Babai probability, one Sage CDF call per squared Gram-Schmidt norm in ``r``.
+    """
+    denom = float(2 * norm) ** 2
+    T = RealDistribution("beta", ((len(r) - 1) / 2, 1.0 / 2))
+    return prod(RR(1 - T.cum_distribution_function(1 - r_ / denom)) for r_ in r)
+
+
+def reference_mitm_babai(r, stddev, q):
+    """
+    MITM-Babai probability, one Sage ``erf`` and ``exp`` call per squared Gram-Schmidt norm in ``r``.
+    """
+    alphaq = sigmaf(stddev)
+    return prod(
+        RR(erf(s * sqrt(RR(pi)) / alphaq) + (alphaq / s) * ((exp(-s * sqrt(RR(pi)) / alphaq) - 1) / RR(pi)))
+        for s in map(sqrt, r)
+    )
+
+
+def timed(f, *args):
+    """
+    Return ``f(*args)`` and the time it took in milliseconds.
+    """
+    start = time.perf_counter()
+    y = f(*args)
+    return y, (time.perf_counter() - start) * 1000
+
+
+def error(log_p, p):
+    """
+    Difference of the logarithms of two probabilities, relative unless they are close to one.
+    """
+    if p <= 0:
+        return "n/a"
+    return f"{float(abs(log_p - RR(p).log()) / max(1, abs(RR(p).log()))):.1e}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--dimensions", type=int, nargs="+", default=[1000, 2000, 4000, 8000], help="lattice dimensions"
+    )
+    parser.add_argument("--q", type=int, default=2**32, help="modulus")
+    parser.add_argument("--stddev", type=float, default=3.2, help="standard deviation of the error")
+    args = parser.parse_args()
+
+    print(f"{'d':>6s} {'kernel':>6s} {'before':>10s} {'after':>10s} {'error':>10s}")
+    for d in args.dimensions:
+        beta = d // 4
+        r_log = log_profile(GSA, d, d // 2, args.q, beta, dual=True)
+        r = GSA(d, d // 2, args.q, beta, dual=True)
+        norm = sqrt(d) * args.stddev
+
+        p, before = timed(reference_babai, r, norm)
+        log_p, after = timed(log_babai, r_log, norm)
+        print(f"{d:6d} {'babai':>6s} {before:8.1f}ms {after:8.2f}ms {error(log_p, p):>10s}")
+
+        p, before = timed(reference_mitm_babai, r, args.stddev, args.q)
+        log_p, after = timed(log_mitm_babai_probability, r_log, args.stddev, args.q)
+        print(f"{d:6d} {'mitm':>6s} {before:8.1f}ms {after:8.2f}ms {error(log_p, p):>10s}")
+
+
+if __name__ == "__main__":
+    main()
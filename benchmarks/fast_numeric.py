@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Compare estimates computed with exact arithmetic and in double precision.
+
+Cost formulas are evaluated with Sage's exact and arbitrary precision arithmetic by default. Within
+``estimator.util.fast_numeric()`` they are evaluated with Python floats instead. This reports, for each scheme and
+attack, the time each mode takes and the difference of the logarithms of the estimated costs.
+
+Run from the root of the repository::
+
+    python benchmarks/fast_numeric.py --schemes Kyber512 TFHE630 --attacks usvp bdd dual_hybrid matzov
+
+"""
+
+import argparse
+import time
+
+from sage.all import log
+
+from estimator import schemes
+from estimator.lwe_dual import dual_hybrid, matzov
+from estimator.lwe_primal import primal_bdd, primal_usvp
+from estimator.util import fast_numeric
+
+ATTACKS = {"usvp": primal_usvp, "bdd": primal_bdd, "dual_hybrid": dual_hybrid, "matzov": matzov}
+
+
+def timed(attack, params, fast):
+    """
+    Return the base-2 logarithm of the cost of ``attack`` on ``params`` and the time it took in seconds.
+    """
+    with fast_numeric(fast):
+        start = time.perf_counter()
+        cost = attack(params)
+        return float(log(cost["rop"], 2)), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--schemes", nargs="+", default=["Kyber512", "TFHE630"], help="parameter sets")
+    parser.add_argument("--attacks", nargs="+", default=list(ATTACKS), choices=list(ATTACKS), help="attacks")
+    args = parser.parse_args()
+
+    print(f"{'scheme':>16s} {'attack':>12s} {'exact':>8s} {'fast':>8s} {'rop':>8s} {'error':>8s}")
+    for name in args.schemes:
+        params = getattr(schemes, name)
+        for attack in args.attacks:
+            exact, exact_time = timed(ATTACKS[attack], params, False)
+            fast, fast_time = timed(ATTACKS[attack], params, True)
+            print(
+                f"{name:>16s} {attack:>12s} {exact_time:7.2f}s {fast_time:7.2f}s {exact:8.2f} {abs(fast - exact):8.1e}"
+            )
+
+
+if __name__ == "__main__":
+    main()
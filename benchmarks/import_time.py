@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+Measure the cold-start cost of importing each subsystem of the estimator.
+
+Every measurement runs in a fresh interpreter, so module caches from earlier measurements do not leak
+into later ones. The cost of ``import sage.all``, which every subsystem pays, is reported separately.
+
+Run from the root of the repository::
+
+    python benchmarks/import_time.py --repeat 3
+
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+SUBSYSTEMS = ("ND", "Logging", "RC", "Simulator", "LWE", "NTRU", "SIS", "schemes", "ISD", "PCE", "LIP")
+
+TEMPLATE = """
+import time
+t = time.perf_counter()
+{statement}
+print(time.perf_counter() - t)
+"""
+
+
+def time_statement(statement, repeat=1):
+    """
+    Return the median wall time in seconds of running ``statement`` in a fresh interpreter.
+
+    :param statement: Python statement to time.
+    :param repeat: number of fresh interpreters to average over.
+
+    """
+    timings = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", TEMPLATE.format(statement=statement)],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        timings.append(float(out.stdout.strip().splitlines()[-1]))
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="fresh interpreters per measurement")
+    parser.add_argument("subsystems", nargs="*", default=SUBSYSTEMS, help="subsystems to measure")
+    args = parser.parse_args()
+
+    baseline = time_statement("import sage.all", args.repeat)
+    print(f"{'sage.all':12s} {baseline:8.3f}s")
+
+    for name in args.subsystems:
+        t = time_statement(f"from estimator import {name}", args.repeat)
+        print(f"{name:12s} {t:8.3f}s  (+{t - baseline:.3f}s)")
+
+    t = time_statement("from estimator import *", args.repeat)
+    print(f"{'*':12s} {t:8.3f}s  (+{t - baseline:.3f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Measure the per-evaluation cost of log messages that are discarded at the default logging level.
+
+Searches log every point they evaluate at a high level of detail. Formatting such a message calls ``Cost.__repr__``,
+which is expensive, so messages are only built when they are printed. This compares building the message eagerly
+with passing a callable, and reports the time a search spends per evaluation of a cheap cost function.
+
+Run from the root of the repository::
+
+    python benchmarks/logging_overhead.py --number 20000
+
+"""
+
+import argparse
+import timeit
+
+from estimator import LWE, schemes
+from estimator.io import Logging
+from estimator.util import local_minimum
+
+
+def per_call(statement, number, **namespace):
+    """
+    Return the best time in microseconds of running ``statement`` once.
+
+    :param statement: Python statement to time.
+    :param number: number of runs per measurement.
+
+    """
+    timer = timeit.Timer(statement, globals=namespace)
+    return min(timer.repeat(repeat=5, number=number)) / number * 10**6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000, help="runs per measurement")
+    args = parser.parse_args()
+
+    cost = LWE.primal_usvp(schemes.Kyber512)
+    namespace = {"Logging": Logging, "cost": cost, "x": cost["beta"]}
+
+    eager = per_call('Logging.log("bins", 5, f"({x}, {cost!r})")', args.number, **namespace)
+    lazy = per_call('Logging.log("bins", 5, lambda: f"({x}, {cost!r})")', args.number, **namespace)
+    print(f"{'eager':12s} {eager:8.2f}µs per discarded message")
+    print(f"{'lazy':12s} {lazy:8.2f}µs per discarded message")
+
+    def search():
+        with local_minimum(40, 1000) as it:
+            for beta in it:
+                it.update(cost)
+        return it
+
+    evaluations = len(search()._all_x)
+    t = per_call("search()", max(args.number // 100, 1), search=search) / evaluations
+    print(f"{'search':12s} {t:8.2f}µs per evaluation (was ≈{t + eager - lazy:.2f}µs with eager messages)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,57 @@
 # -*- coding: utf-8 -*-
+"""
+Subsystems are imported on first access (:pep:`562`), so ``from estimator import LWE`` only loads what the
+LWE estimates need.
+"""
+from importlib import import_module as _import_module
 
-__all__ = ['ND', 'Logging', 'RC', 'Simulator', 'LWE', 'NTRU', 'SIS', 'schemes', 'ISD', 'PCE', 'LIP']
-
-from .nd import NoiseDistribution as ND
-from .io import Logging
-from .reduction import RC
-from . import simulator as Simulator
-from . import lwe as LWE
-from . import ntru as NTRU
-from . import sis as SIS
-from . import schemes
-from . import ISD
-from . import pce as PCE
-from . import lip as LIP
+__all__ = ['ND', 'Logging', 'RC', 'Simulator', 'LWE', 'NTRU', 'SIS', 'schemes', 'ISD', 'PCE', 'LIP',
+           'cache_info', 'cache_clear']
+
+# name → (module, attribute), where ``None`` means the module itself
+_lazy_attributes = {
+    "ND": (".nd", "NoiseDistribution"),
+    "Logging": (".io", "Logging"),
+    "RC": (".reduction", "RC"),
+    "Simulator": (".simulator", None),
+    "LWE": (".lwe", None),
+    "NTRU": (".ntru", None),
+    "SIS": (".sis", None),
+    "schemes": (".schemes", None),
+    "ISD": (".ISD", None),
+    "PCE": (".pce", None),
+    "LIP": (".lip", None),
+    "cache_info": (".cache", "cache_info"),
+    "cache_clear": (".cache", "cache_clear"),
+}
+
+
+def __getattr__(name):
+    """
+    Import the subsystem ``name`` on first access.
+
+    EXAMPLE::
+
+        >>> import estimator
+        >>> estimator.ND.DiscreteGaussian(3.0)
+        D(σ=3.00)
+        >>> estimator.FOO
+        Traceback (most recent call last):
+        ...
+        AttributeError: module 'estimator' has no attribute 'FOO'
+
+    """
+    try:
+        module, attribute = _lazy_attributes[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = _import_module(module, __name__)
+    if attribute is not None:
+        value = getattr(value, attribute)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
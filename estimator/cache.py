@@ -0,0 +1,553 @@
+# -*- coding: utf-8 -*-
+"""
+Caching of estimates.
+
+Cost functions which are evaluated repeatedly while optimising attack parameters are memoized with :func:`cached`,
+which keeps at most ``conf.cache_maxsize`` entries per function and evicts the least recently used ones::
+
+    >>> from estimator.lwe_primal import PrimalUSVP
+    >>> PrimalUSVP.cost_gsa.cache_info()  # doctest: +SKIP
+    CacheInfo(hits=..., misses=..., maxsize=4096, currsize=...)
+
+All memoized functions that have been imported can be inspected and cleared together with
+``estimator.cache_info()`` and ``estimator.cache_clear()``.
+
+Estimates are deterministic, so the results of ``LWE.estimate``, ``NTRU.estimate``, ``SIS.estimate`` and their
+``rough`` variants can be stored on disk and reused across processes. This cache is opt-in::
+
+    >>> from estimator import cache
+    >>> cache.enable_persistent_cache("estimates.sqlite")  # doctest: +SKIP
+
+Entries are keyed on a canonical encoding of the parameters, the name of the estimate, its configuration (such as
+the reduction cost model and the reduction shape model) and a digest of the estimator's source code, so changing
+the code invalidates all previous entries.
+
+.. note :: Entries are stored as pickles, only point this cache at files you trust.
+
+"""
+import hashlib
+import inspect
+import os
+import pickle
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict, namedtuple
+from collections.abc import Mapping, MutableMapping
+from contextlib import contextmanager
+from copy import copy
+from dataclasses import fields, is_dataclass
+from fnmatch import fnmatchcase
+from functools import partial, wraps
+
+from sage.all import oo
+
+from . import numeric
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+CacheStatistics = namedtuple("CacheStatistics", ["hits", "misses", "maxsize", "currsize", "memory"])
+
+# qualified name → memoized function
+_registry = {}
+
+# hits of all memoized functions in this process, reported by profiled estimates
+_hits = 0
+
+
+class ParameterKey(tuple):
+    """
+    Canonical, hashable and immutable key for problem parameters.
+
+    The key consists of the class name and the values of all fields except the ``tag`` naming the parameter set,
+    nested dataclasses such as noise distributions are encoded with all their fields. Equivalent instances which
+    only differ in their name thus share memoized results. Memoized cost functions expect normalized instances,
+    so callers should call ``params.normalize()`` first.
+
+    EXAMPLE::
+
+        >>> from estimator import LWE, ND, schemes
+        >>> from estimator.cache import ParameterKey
+        >>> ParameterKey.of(schemes.Kyber512) == ParameterKey.of(schemes.Kyber512.updated(tag="Kyber"))
+        True
+        >>> ParameterKey.of(schemes.Kyber512) == ParameterKey.of(schemes.Kyber512.updated(m=1024))
+        False
+        >>> ParameterKey.of(ND.DiscreteGaussian(1.0)) == ParameterKey.of(ND.DiscreteGaussian(1.0, n=8))
+        False
+
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def of(cls, params):
+        """
+        Return the key for ``params``.
+
+        :param params: a dataclass instance, e.g. ``LWEParameters``.
+        """
+        return cls(
+            (type(params).__qualname__,)
+            + tuple(cls._encode(getattr(params, f.name)) for f in fields(params) if f.name != "tag")
+        )
+
+    @classmethod
+    def _encode(cls, x):
+        if is_dataclass(x) and not isinstance(x, type):
+            return (type(x).__qualname__,) + tuple(cls._encode(getattr(x, f.name)) for f in fields(x))
+        return x
+
+
+def approximate_size(obj, seen=None):
+    """
+    Approximate memory in bytes used by ``obj`` and the containers, dataclasses and costs it references.
+
+    Objects referenced more than once are only counted once.
+
+    :param obj: object to measure
+    :param seen: ids of objects already counted
+
+    EXAMPLE::
+
+        >>> from estimator.cache import approximate_size
+        >>> approximate_size([1.0, 2.0]) > approximate_size([])
+        True
+        >>> x = (1.0, 2.0)
+        >>> approximate_size([x, x]) < approximate_size([x, (1.0, 2.0)])
+        True
+
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes)):
+        return size
+    if isinstance(obj, Mapping):
+        return size + sum(approximate_size(k, seen) + approximate_size(v, seen) for k, v in obj.items())
+    if isinstance(obj, (tuple, list, set, frozenset)):
+        return size + sum(approximate_size(x, seen) for x in obj)
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return size + sum(approximate_size(getattr(obj, f.name), seen) for f in fields(obj))
+    return size
+
+
+_memoization_suspended = 0
+
+
+@contextmanager
+def suspend_memoization():
+    """
+    Do not memoize new results of :func:`cached` functions, e.g. because searches may be cut short.
+
+    EXAMPLE::
+
+        >>> from estimator.cache import cached, suspend_memoization
+        >>> f = cached(lambda x: x)
+        >>> with suspend_memoization():
+        ...     f(1)
+        1
+        >>> f.cache_info().currsize
+        0
+
+    """
+    global _memoization_suspended
+    _memoization_suspended += 1
+    try:
+        yield
+    finally:
+        _memoization_suspended -= 1
+
+
+def cached(f=None, maxsize=None):
+    """
+    Memoize ``f`` in a bounded least-recently-used cache.
+
+    Arguments are bound to the signature of ``f`` with defaults applied, so ``f(1)`` and ``f(1, b=2)`` share an
+    entry if ``b`` defaults to ``2``. Problem parameters are keyed by their :class:`ParameterKey` and ``log_level`` is
+    ignored. Arguments that are not hashable bypass the cache, costs flagged with a ``status`` are not memoized.
+
+    Callers receive a copy of memoized costs, so they may modify them.
+
+    :param f: function to memoize.
+    :param maxsize: maximum number of entries, ``None`` for ``conf.cache_maxsize``, which is read on every
+        call. If that is ``None`` too, the cache is unbounded.
+
+    The returned function has ``cache_info()``, returning hits, misses, maximum and current size, and
+    ``cache_clear()``.
+
+    EXAMPLE::
+
+        >>> from estimator.cache import cached
+        >>> @cached(maxsize=2)
+        ... def f(a, b=2):
+        ...     return a * b
+        >>> f(1), f(1, b=2), f(a=1), f(2), f(3)
+        (2, 2, 2, 4, 6)
+        >>> f.cache_info()
+        CacheInfo(hits=2, misses=3, maxsize=2, currsize=2)
+        >>> f(1); f.cache_info().misses
+        2
+        4
+        >>> f.cache_clear(); f.cache_info()
+        CacheInfo(hits=0, misses=0, maxsize=2, currsize=0)
+
+    """
+    if f is None:
+        return partial(cached, maxsize=maxsize)
+
+    signature = inspect.signature(f)
+    var_keyword = [k for k, v in signature.parameters.items() if v.kind == inspect.Parameter.VAR_KEYWORD]
+    ignored = ("log_level",)
+    cache = OrderedDict()
+    stats = {"hits": 0, "misses": 0}
+    lock = threading.RLock()
+
+    def current_maxsize():
+        from . import conf  # conf imports modules using this decorator
+
+        return conf.cache_maxsize if maxsize is None else maxsize
+
+    @wraps(f)
+    def wrapper(*args, **kwds):
+        global _hits
+        bound = signature.bind(*args, **kwds)
+        bound.apply_defaults()
+        for k in var_keyword:
+            bound.arguments[k] = tuple(sorted(bound.arguments[k].items()))
+        key = tuple(
+            ParameterKey.of(v) if is_dataclass(v) and not isinstance(v, type) else v
+            for k, v in bound.arguments.items()
+            if k not in ignored
+        ) + (numeric.fast(),)  # results computed in double precision differ slightly
+
+        try:
+            with lock:
+                value = cache[key]
+                cache.move_to_end(key)
+                stats["hits"] += 1
+                _hits += 1
+        except KeyError:
+            value = f(*args, **kwds)
+            with lock:
+                stats["misses"] += 1
+                # costs flagged with a status, e.g. pruned ones, depend on more than the arguments
+                if not _memoization_suspended and not (isinstance(value, Mapping) and "status" in value):
+                    cache[key] = value
+                    cache.move_to_end(key)
+                size = current_maxsize()
+                while size is not None and len(cache) > size:
+                    cache.popitem(last=False)
+        except TypeError:  # unhashable
+            return f(*args, **kwds)
+
+        # callers tag their costs
+        return copy(value) if isinstance(value, MutableMapping) else value
+
+    def cache_info():
+        with lock:
+            return CacheInfo(stats["hits"], stats["misses"], current_maxsize(), len(cache))
+
+    def cache_clear():
+        with lock:
+            cache.clear()
+            stats["hits"] = stats["misses"] = 0
+
+    def cache_memory():
+        with lock:
+            items = list(cache.items())
+        return approximate_size(items)
+
+    wrapper.cache_info = cache_info
+    wrapper.cache_clear = cache_clear
+    wrapper.cache_memory = cache_memory
+    _registry[f"{f.__module__}.{f.__qualname__}"] = wrapper
+    return wrapper
+
+
+def cache_info(pattern="*"):
+    """
+    Statistics of memoized functions.
+
+    :param pattern: only report functions whose qualified name matches this shell-style pattern.
+    :returns: a dictionary mapping qualified names to hits, misses, maximum size, current size and approximate
+        memory in bytes.
+
+    Only functions in modules that have been imported are reported.
+
+    EXAMPLE::
+
+        >>> import estimator
+        >>> from estimator import LWE, schemes
+        >>> estimator.cache_clear()
+        >>> _ = LWE.primal_usvp(schemes.Kyber512)
+        >>> info = estimator.cache_info("*PrimalUSVP.cost_gsa")
+        >>> list(info)
+        ['estimator.lwe_primal.PrimalUSVP.cost_gsa']
+        >>> info['estimator.lwe_primal.PrimalUSVP.cost_gsa'].currsize > 0
+        True
+        >>> estimator.cache_info("*PrimalUSVP.cost_gsa")['estimator.lwe_primal.PrimalUSVP.cost_gsa'].memory > 0
+        True
+
+    """
+    return {
+        name: CacheStatistics(*f.cache_info(), f.cache_memory())
+        for name, f in sorted(_registry.items())
+        if fnmatchcase(name, pattern)
+    }
+
+
+def cache_clear(pattern="*"):
+    """
+    Clear memoized functions.
+
+    :param pattern: only clear functions whose qualified name matches this shell-style pattern.
+
+    EXAMPLE::
+
+        >>> import estimator
+        >>> from estimator import LWE, schemes
+        >>> _ = LWE.primal_usvp(schemes.Kyber512)
+        >>> estimator.cache_clear("*.PrimalUSVP.*")
+        >>> estimator.cache_info("*PrimalUSVP.cost_gsa")['estimator.lwe_primal.PrimalUSVP.cost_gsa'].currsize
+        0
+
+    """
+    for name, f in _registry.items():
+        if fnmatchcase(name, pattern):
+            f.cache_clear()
+
+
+def canonical(x):
+    """
+    Return a canonical, hashable encoding of ``x`` built from tuples, strings, integers and floats.
+
+    Dataclasses (such as parameters and noise distributions) are encoded field by field, numbers are encoded
+    independently of their Sage or Python type and callables by their qualified name.
+
+    :param x: object to encode
+
+    EXAMPLE::
+
+        >>> from sage.all import RR, ZZ, oo
+        >>> from estimator.cache import canonical
+        >>> from estimator import ND
+        >>> canonical(ND.DiscreteGaussian(3.0))
+        ('NoiseDistribution', ('stddev', 3), ('mean', 0), ('n', None), ('bounds', ('-oo', 'oo')), ...)
+        >>> canonical(RR(3)) == canonical(ZZ(3)) == canonical(3)
+        True
+        >>> canonical(oo)
+        'oo'
+
+    """
+    if is_dataclass(x) and not isinstance(x, type):
+        return (type(x).__name__,) + tuple((f.name, canonical(getattr(x, f.name))) for f in fields(x))
+    if x is None or isinstance(x, (bool, str)):
+        return x
+    if isinstance(x, (tuple, list)):
+        return tuple(canonical(y) for y in x)
+    if isinstance(x, dict):
+        return tuple(sorted((str(k), canonical(v)) for k, v in x.items()))
+    if isinstance(x, partial):
+        return ("partial", canonical(x.func), canonical(x.args), canonical(x.keywords))
+    if isinstance(x, type) or callable(x) and hasattr(x, "__qualname__"):
+        return f"{x.__module__}.{x.__qualname__}"
+
+    try:
+        if x == oo:
+            return "oo"
+        if x == -oo:
+            return "-oo"
+        if x == int(x):
+            return int(x)
+        return float(x)
+    except (TypeError, ValueError, OverflowError, ArithmeticError):
+        pass
+
+    if hasattr(x, "__dict__"):
+        # e.g. reduction cost models, which are configured by their attributes
+        return (f"{type(x).__module__}.{type(x).__qualname__}", canonical(vars(x)))
+    return repr(x)
+
+
+def estimator_version():
+    """
+    A digest of the source code of the estimator, used to invalidate persistent cache entries.
+    """
+    global _estimator_version
+    if _estimator_version is None:
+        h = hashlib.sha256()
+        directory = os.path.dirname(os.path.abspath(__file__))
+        for filename in sorted(os.listdir(directory)):
+            if filename.endswith(".py"):
+                h.update(filename.encode())
+                with open(os.path.join(directory, filename), "rb") as fh:
+                    h.update(fh.read())
+        _estimator_version = h.hexdigest()[:16]
+    return _estimator_version
+
+
+_estimator_version = None
+
+
+class PersistentCache:
+    """
+    A key-value store for estimates backed by an SQLite database.
+
+    EXAMPLE::
+
+        >>> import os, tempfile
+        >>> from estimator.cache import PersistentCache
+        >>> C = PersistentCache(os.path.join(tempfile.mkdtemp(), "estimates.sqlite"))
+        >>> key = C.key("LWE.estimate", (1, 2))
+        >>> C.get(key) is None
+        True
+        >>> C.set(key, {"usvp": 1})
+        >>> C.get(key), len(C)
+        ({'usvp': 1}, 1)
+        >>> C.clear(); len(C)
+        0
+
+    """
+
+    def __init__(self, path):
+        """
+        :param path: SQLite database file, created if it does not exist.
+        """
+        self.path = os.path.expanduser(path)
+        self._connection = None
+        self._pid = None
+
+    @property
+    def connection(self):
+        # SQLite connections must not be shared with forked children
+        if self._connection is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, timeout=60)
+            self._connection.execute("CREATE TABLE IF NOT EXISTS estimates (key TEXT PRIMARY KEY, value BLOB)")
+            self._connection.commit()
+            self._pid = os.getpid()
+        return self._connection
+
+    @staticmethod
+    def key(name, params, **config):
+        """
+        Key for the estimate ``name`` on ``params`` with configuration ``config``.
+
+        :param name: name of the estimate, e.g. ``"LWE.estimate"``.
+        :param params: problem parameters.
+        :param config: any further input that determines the result, e.g. ``red_cost_model``.
+
+        """
+        encoding = repr((name, canonical(params), canonical(config), estimator_version()))
+        return hashlib.sha256(encoding.encode()).hexdigest()
+
+    def get(self, key):
+        """
+        Return the value stored for ``key`` or ``None``.
+        """
+        row = self.connection.execute("SELECT value FROM estimates WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return pickle.loads(row[0])
+
+    def set(self, key, value):
+        """
+        Store ``value`` for ``key``, values which cannot be pickled are silently not stored.
+        """
+        try:
+            blob = pickle.dumps(value)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return
+        with self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO estimates VALUES (?, ?)", (key, blob))
+
+    def clear(self):
+        """
+        Remove all entries.
+        """
+        with self.connection:
+            self.connection.execute("DELETE FROM estimates")
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM estimates").fetchone()[0]
+
+
+persistent_cache = None
+
+
+def enable_persistent_cache(path="~/.cache/lattice-estimator/estimates.sqlite"):
+    """
+    Store the results of ``estimate()`` and ``estimate.rough()`` in ``path`` and reuse them.
+
+    :param path: SQLite database file.
+    :returns: the cache
+
+    """
+    global persistent_cache
+    persistent_cache = PersistentCache(path)
+    return persistent_cache
+
+
+def disable_persistent_cache():
+    """
+    Stop using the persistent cache for estimates.
+    """
+    global persistent_cache
+    persistent_cache = None
+
+
+def cached_estimate(f, name, params, **config):
+    """
+    Return ``f()``, looking it up in the persistent cache first if it is enabled.
+
+    :param f: function computing the estimate.
+    :param name: name of the estimate, e.g. ``"LWE.estimate"``.
+    :param params: problem parameters.
+    :param config: any further input that determines the result.
+
+    Results containing costs with a ``status``, such as timed out estimates, are not stored.
+
+    EXAMPLE::
+
+        >>> import os, tempfile
+        >>> from estimator import cache, schemes
+        >>> _ = cache.enable_persistent_cache(os.path.join(tempfile.mkdtemp(), "estimates.sqlite"))
+        >>> cache.cached_estimate(lambda: 1, "test", schemes.Kyber512)
+        1
+        >>> cache.cached_estimate(lambda: 2, "test", schemes.Kyber512)
+        1
+        >>> cache.cached_estimate(lambda: 2, "test", schemes.Kyber512, red_shape_model="cn11")
+        2
+
+    Cached estimates are reported just like fresh ones::
+
+        >>> from estimator import SIS
+        >>> r = SIS.estimate.rough(schemes.Dilithium2_MSIS_WkUnf)
+        lattice  :: rop: ≈2^123.5, red: ≈2^123.5, sieve: ≈2^-332.2, β: 423, η: 423, ζ: 1, d: 2303, ...
+        >>> r == SIS.estimate.rough(schemes.Dilithium2_MSIS_WkUnf)
+        lattice  :: rop: ≈2^123.5, red: ≈2^123.5, sieve: ≈2^-332.2, β: 423, η: 423, ζ: 1, d: 2303, ...
+        True
+        >>> len(cache.persistent_cache)
+        3
+        >>> cache.disable_persistent_cache()
+
+    """
+    cache = persistent_cache
+    if cache is None:
+        return f()
+
+    if numeric.fast():
+        config["fast_numeric"] = True
+    key = cache.key(name, params, **config)
+    value = cache.get(key)
+    if value is None:
+        value = f()
+        # estimates flagged with a status, e.g. because they timed out, are not reproducible
+        if not isinstance(value, Mapping) or not any("status" in v for v in value.values() if isinstance(v, Mapping)):
+            cache.set(key, value)
+    return value
@@ -13,6 +13,10 @@ red_shape_model = "gsa"
 red_simulator = GSA
 mitm_opt = "analytical"
 max_n_cache = 10000
+chisquared_cache_size = 512
+cache_maxsize = 4096
+# evaluate cost formulas in double precision, see :mod:`estimator.numeric`
+fast_numeric = False
 
 
 def ntru_fatigue_lb(n):
@@ -20,6 +20,9 @@ class Cost(UserDict):
         "repetitions": False,
         "tag": False,
         "problem": False,
+        "status": False,
+        "bracket": False,
+        "profile": False,
     }
 
     @staticmethod
@@ -84,14 +87,14 @@ class Cost(UserDict):
                 else:
                     vv = "%7s" % ("≈2^%.1f" % log(v, 2))
             except TypeError:  # strings and such
-                vv = "%8s" % v
+                vv = "%8s" % (v,)
             if compact is True:
                 kk = kk.strip()
                 vv = vv.strip()
             return f"{kk}: {vv}"
 
-        # we store the problem instance in a cost object for reference
-        s = [value_str(k, v) for k, v in self.items() if k != "problem"]
+        # we store the problem instance and how long it took to estimate in a cost object for reference
+        s = [value_str(k, v) for k, v in self.items() if k not in ("problem", "profile")]
         delimiter = "\n" if newline is True else ", "
         return delimiter.join(s)
 
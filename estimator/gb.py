@@ -141,7 +141,7 @@ class AroraGB:
             current.register_impermanent(t=False, m=True)
             current = current.reorder("rop", "m", "dreg", "t")
 
-            Logging.log("repeat", log_level + 1, repr(current))
+            Logging.log("repeat", log_level + 1, lambda: repr(current))
 
             if best is None:
                 best = current
@@ -236,7 +236,7 @@ class AroraGB:
                 omega=omega,
                 log_level=log_level,
             )
-            Logging.log("gb", log_level, f"b: {cost!r}")
+            Logging.log("gb", log_level, lambda: f"b: {cost!r}")
             best = min(best, cost, key=lambda x: x["dreg"])
 
         if params.Xe.is_Gaussian_like:
@@ -246,7 +246,7 @@ class AroraGB:
                 omega=omega,
                 log_level=log_level,
             )
-            Logging.log("gb", log_level, f"G: {cost!r}")
+            Logging.log("gb", log_level, lambda: f"G: {cost!r}")
             best = min(best, cost, key=lambda x: x["dreg"])
 
         best["tag"] = "arora-gb"
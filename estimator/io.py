@@ -49,9 +49,38 @@ class Logging:
         for logger in loggers:
             logging.getLogger(logger).setLevel(lvl)
 
+    _loggers = {}
+
     @classmethod
     def log(cls, logger, level, msg, *args, **kwds):
+        """
+        Log ``msg`` to ``logger`` at ``level``.
+
+        Nothing is formatted if ``logger`` discards ``level``. In hot code paths pass ``msg`` as a callable returning
+        the message, so that it is only built when it is printed, e.g. ``lambda: f"{cost!r}"``.
+
+        :param logger: one of `Logging.loggers`.
+        :param level: level of detail, `0` is the least detailed.
+        :param msg: a string or a callable returning a string.
+
+        EXAMPLE::
+
+            >>> from estimator.io import Logging
+            >>> def msg():
+            ...     print("formatting")
+            ...     return "message"
+            >>> Logging.log("bins", 5, msg)
+            >>> Logging.log("bins", 0, msg)
+            formatting
+
+        """
         level = int(level)
-        return logging.getLogger(logger).log(
-            cls.INFO - 2 * level, f"{{{level}}} {msg}", *args, **kwds
-        )
+        try:
+            lg = cls._loggers[logger]
+        except KeyError:
+            lg = cls._loggers.setdefault(logger, logging.getLogger(logger))
+        if not lg.isEnabledFor(cls.INFO - 2 * level):
+            return
+        if callable(msg):
+            msg = msg()
+        return lg.log(cls.INFO - 2 * level, f"{{{level}}} {msg}", *args, **kwds)
@@ -8,7 +8,7 @@ from .reduction import cost as costf
 from .reduction import beta as betaf
 from .util import local_minimum
 from .pce_ssa import ssa
-from sage.all import oo, is_prime, sqrt, log, RR, floor, cached_function
+from sage.all import oo, is_prime, sqrt, log, RR, floor
 
 
 class HullAttack():
@@ -3,6 +3,8 @@
 High-level LWE interface
 """
 
+import time
+import warnings
 from functools import partial
 from sage.all import oo
 
@@ -17,12 +19,18 @@ from .conf import (
     red_cost_model as red_cost_model_default,
     red_shape_model as red_shape_model_default,
 )
-from .util import batch_estimate, f_name
+from .util import batch_estimate, decide, f_name, prune_above
+from .cache import cached_estimate
 from .reduction import RC
 
 
 class Estimate:
 
+    # in order of how cheap we expect them to be, so that good bounds or witnesses are found early. Only the primal
+    # attacks give up above the bound, see `prune_above`, the others always run in full. BKW and Arora-GB come last
+    # since they are rarely cheapest, so their costs seldom tighten the bound for the attacks after them.
+    _minimum_only_order = ("usvp", "bdd", "dual_hybrid", "dual", "bdd_hybrid", "bdd_mitm_hybrid", "bkw", "arora-gb")
+
     def rough(self, params, jobs=1, catch_exceptions=True):
         """
         This function makes the following somewhat routine assumptions:
@@ -62,10 +70,13 @@ class Estimate:
             else:
                 algorithms["arora-gb"] = arora_gb.cost_bounded
 
-        res_raw = batch_estimate(
-            params, algorithms.values(), log_level=1, jobs=jobs, catch_exceptions=catch_exceptions
-        )
-        res_raw = res_raw[params]
+        def run():
+            res_raw = batch_estimate(
+                params, algorithms.values(), log_level=1, jobs=jobs, catch_exceptions=catch_exceptions
+            )
+            return res_raw[params]
+
+        res_raw = cached_estimate(run, "LWE.estimate.rough", params)
         res = {
             algorithm: v
             for algorithm, attack in algorithms.items()
@@ -82,6 +93,89 @@ class Estimate:
 
         return res
 
+    def _cheapest_first(self, algorithms):
+        order = self._minimum_only_order
+        return sorted(algorithms, key=lambda k: order.index(k) if k in order else len(order))
+
+    def _algorithms(self, params, red_cost_model, red_shape_model, deny_list, add_list):
+        algorithms = {}
+
+        algorithms["arora-gb"] = guess_composition(arora_gb)
+        algorithms["bkw"] = coded_bkw
+
+        algorithms["usvp"] = partial(
+            primal_usvp, red_cost_model=red_cost_model, red_shape_model=red_shape_model
+        )
+        algorithms["bdd"] = partial(
+            primal_bdd, red_cost_model=red_cost_model, red_shape_model=red_shape_model
+        )
+        algorithms["bdd_hybrid"] = partial(
+            primal_hybrid,
+            mitm=False,
+            babai=False,
+            red_cost_model=red_cost_model,
+            red_shape_model=red_shape_model,
+        )
+        # we ignore the case of mitm=True babai=False for now, due to it being overly-optimistic
+        algorithms["bdd_mitm_hybrid"] = partial(
+            primal_hybrid,
+            mitm=True,
+            babai=True,
+            red_cost_model=red_cost_model,
+            red_shape_model=red_shape_model,
+        )
+        algorithms["dual"] = partial(dual, red_cost_model=red_cost_model)
+        algorithms["dual_hybrid"] = partial(dual_hybrid, red_cost_model=red_cost_model)
+
+        algorithms = {k: v for k, v in algorithms.items() if k not in deny_list}
+        algorithms.update(add_list)
+        return algorithms
+
+    def at_least(
+        self,
+        params,
+        lambda_bits,
+        red_cost_model=red_cost_model_default,
+        red_shape_model=red_shape_model_default,
+        deny_list=tuple(),
+        add_list=tuple(),
+        catch_exceptions=True,
+    ):
+        """
+        Decide if all attacks cost at least `2^λ`.
+
+        Attacks run one after another, presumably cheap ones first. Each attack stops optimising as soon as it finds
+        a cost below `2^λ` and then all remaining attacks are skipped. This is much cheaper than establishing the
+        cost of every attack when only a pass/fail answer is needed.
+
+        :param params: LWE parameters.
+        :param lambda_bits: security level `λ`.
+        :param red_cost_model: How to cost lattice reduction.
+        :param red_shape_model: How to model the shape of a reduced basis (applies to primal attacks)
+        :param deny_list: skip these algorithms
+        :param add_list: add these ``(name, function)`` pairs to the list of algorithms to estimate.
+        :param catch_exceptions: When an estimate fails, just print a warning.
+        :returns: ``(secure, attack, cost)`` which is truthy iff the instance is secure. If it is not, ``attack`` and
+            ``cost`` are a witness, else they are the cheapest attack found.
+
+        EXAMPLE ::
+
+            >>> from estimator import *
+            >>> LWE.estimate.at_least(schemes.Kyber512, 150, deny_list=("arora-gb", "bkw"))
+            Decision(secure=False, attack='usvp', cost=rop: ≈2^150.0, red: ≈2^150.0, δ: 1.003786, β: 430, d: 843)
+
+            >>> deny_list = ("arora-gb", "bkw", "dual", "dual_hybrid", "bdd_hybrid", "bdd_mitm_hybrid")
+            >>> secure, attack, cost = LWE.estimate.at_least(schemes.Kyber512, 128, deny_list=deny_list)
+            >>> secure, attack
+            (True, 'bdd')
+
+        """
+        params = params.normalize()
+
+        algorithms = self._algorithms(params, red_cost_model, red_shape_model, deny_list, add_list)
+        algorithms = {k: algorithms[k] for k in self._cheapest_first(algorithms)}
+        return decide(params, algorithms, 2**lambda_bits, catch_exceptions=catch_exceptions)
+
     def __call__(
         self,
         params,
@@ -91,6 +185,10 @@ class Estimate:
         add_list=tuple(),
         jobs=1,
         catch_exceptions=True,
+        timeout=None,
+        minimum_only=False,
+        deadline=None,
+        profile=False,
     ):
         """
         Run all estimates.
@@ -100,8 +198,20 @@ class Estimate:
         :param red_shape_model: How to model the shape of a reduced basis (applies to primal attacks)
         :param deny_list: skip these algorithms
         :param add_list: add these ``(name, function)`` pairs to the list of algorithms to estimate.a
-        :param jobs: Use multiple threads in parallel.
+        :param jobs: Use multiple threads in parallel. Ignored with ``minimum_only``, which runs algorithms one after
+            another in this process: they are pruned by the costs found before them, see
+            :func:`estimator.util.prune_above`, which only applies within this process.
         :param catch_exceptions: When an estimate fails, just print a warning.
+        :param timeout: Give up on an algorithm after this many seconds, either a number or a dictionary mapping
+            algorithm names to seconds.
+        :param minimum_only: Only establish the cost of the cheapest algorithm. Algorithms run one after another,
+            presumably cheap ones first, and give up as soon as they cannot beat the cheapest cost found so far.
+            Such algorithms are reported with a lower bound on their cost and ``status="pruned"``.
+        :param deadline: Return the best costs found so far after about this many seconds. Costs are then flagged
+            with ``status`` either "converged" or "partial", the latter also giving the ``bracket`` the search was
+            narrowed down to when it was cut short.
+        :param profile: Attach the resources each algorithm took to estimate to its cost as ``profile``, see
+            :class:`estimator.util.Profile`. Profiled estimates bypass the persistent cache.
 
         EXAMPLE ::
 
@@ -113,45 +223,100 @@ class Estimate:
             dual                 :: rop: ≈2^149.9, mem: ≈2^97.1, m: 512, β: 424, d: 1024, ↻: 1, tag: dual
             dual_hybrid          :: rop: ≈2^139.2, red: ≈2^139.0, guess: ≈2^136.2, β: 385, p: 6, ζ: 15, t: 30, ...
 
-        """
-        params = params.normalize()
+        Algorithms can be given a time budget::
 
-        algorithms = {}
+            >>> deny_list = ("arora-gb", "bdd", "bdd_hybrid", "bdd_mitm_hybrid", "dual", "dual_hybrid")
+            >>> _ = LWE.estimate(schemes.Kyber512, deny_list=deny_list, timeout={"bkw": 0.001})
+            bkw                  :: timed out
+            usvp                 :: rop: ≈2^143.8, red: ≈2^143.8, δ: 1.003941, β: 406, d: 998, tag: usvp
 
-        algorithms["arora-gb"] = guess_composition(arora_gb)
-        algorithms["bkw"] = coded_bkw
+        If we are only interested in the cheapest attack, we can skip optimising expensive ones::
 
-        algorithms["usvp"] = partial(
-            primal_usvp, red_cost_model=red_cost_model, red_shape_model=red_shape_model
-        )
-        algorithms["bdd"] = partial(
-            primal_bdd, red_cost_model=red_cost_model, red_shape_model=red_shape_model
-        )
-        algorithms["bdd_hybrid"] = partial(
-            primal_hybrid,
-            mitm=False,
-            babai=False,
-            red_cost_model=red_cost_model,
-            red_shape_model=red_shape_model,
-        )
-        # we ignore the case of mitm=True babai=False for now, due to it being overly-optimistic
-        algorithms["bdd_mitm_hybrid"] = partial(
-            primal_hybrid,
-            mitm=True,
-            babai=True,
-            red_cost_model=red_cost_model,
-            red_shape_model=red_shape_model,
-        )
-        algorithms["dual"] = partial(dual, red_cost_model=red_cost_model)
-        algorithms["dual_hybrid"] = partial(dual_hybrid, red_cost_model=red_cost_model)
+            >>> deny_list = ("arora-gb", "bkw", "dual", "dual_hybrid")
+            >>> res = LWE.estimate(schemes.Kyber512, deny_list=deny_list, minimum_only=True)
+            usvp                 :: rop: ≈2^143.8, red: ≈2^143.8, δ: 1.003941, β: 406, d: 998, tag: usvp
+            bdd                  :: rop: ≈2^140.3, red: ≈2^139.7, svp: ≈2^138.8, β: 391, η: 421, d: 1013, tag: bdd
+            >>> res["bdd_hybrid"]["rop"] >= res["bdd"]["rop"]
+            True
 
-        algorithms = {k: v for k, v in algorithms.items() if k not in deny_list}
-        algorithms.update(add_list)
+        We can also ask for the best we can do in a given time, here none at all::
 
-        res_raw = batch_estimate(
-            params, algorithms.values(), log_level=1, jobs=jobs, catch_exceptions=catch_exceptions
-        )
-        res_raw = res_raw[params]
+            >>> deny_list = ("arora-gb", "bkw", "bdd", "bdd_hybrid", "bdd_mitm_hybrid", "dual_hybrid")
+            >>> res = LWE.estimate(schemes.Kyber512.updated(n=640), deny_list=deny_list, deadline=0)
+            usvp                 :: rop: ≈2^211.8, red: ≈2^211.8, δ: 1.002801, β: 655, d: 892, status: partial, ...
+            dual                 :: rop: ≈2^211.9, mem: ≈2^141.1, m: 512, β: 648, d: 1152, ↻: 1, status: partial, ...
+            >>> res["dual"]["status"], res["dual"]["bracket"]
+            ('partial', (40, 1272))
+
+        To see which algorithms take longest to estimate, we can profile them::
+
+            >>> deny_list = ("arora-gb", "bkw", "bdd_hybrid", "bdd_mitm_hybrid", "dual", "dual_hybrid")
+            >>> res = LWE.estimate(schemes.Kyber512, deny_list=deny_list, profile=True)
+            usvp                 :: rop: ≈2^143.8, red: ≈2^143.8, δ: 1.003941, β: 406, d: 998, tag: usvp
+            bdd                  :: rop: ≈2^140.3, red: ≈2^139.7, svp: ≈2^138.8, β: 391, η: 421, d: 1013, tag: bdd
+            >>> res["bdd"]["profile"].evaluations > 0
+            True
+
+        """
+        params = params.normalize()
+
+        algorithms = self._algorithms(params, red_cost_model, red_shape_model, deny_list, add_list)
+
+        if isinstance(timeout, dict):
+            timeout = {f_name(algorithms[k]): v for k, v in timeout.items() if k in algorithms}
+
+        def run():
+            res_raw = batch_estimate(
+                params,
+                algorithms.values(),
+                log_level=1,
+                jobs=jobs,
+                catch_exceptions=catch_exceptions,
+                timeout=timeout,
+                deadline=deadline,
+                profile=profile,
+            )
+            return res_raw[params]
+
+        def run_minimum_only():
+            stop = None if deadline is None else time.time() + deadline
+            res_raw, best = {}, oo
+            for algorithm in self._cheapest_first(algorithms):
+                with prune_above(best):
+                    res_raw.update(
+                        batch_estimate(
+                            params,
+                            algorithms[algorithm],
+                            log_level=1,
+                            catch_exceptions=catch_exceptions,
+                            timeout=timeout,
+                            deadline=None if stop is None else max(stop - time.time(), 0),
+                            profile=profile,
+                        )[params]
+                    )
+                cost = res_raw.get(f_name(algorithms[algorithm]))
+                if cost is not None and "status" not in cost:
+                    best = min(best, cost["rop"])
+            return res_raw
+
+        if minimum_only:
+            if jobs > 1:
+                # each algorithm is pruned by the costs of those before it, see `prune_above`
+                warnings.warn("minimum_only=True runs algorithms one after another, ignoring jobs", stacklevel=2)
+            run = run_minimum_only
+
+        if add_list or profile:
+            # user supplied functions cannot be keyed reliably and cached estimates take no time
+            res_raw = run()
+        else:
+            res_raw = cached_estimate(
+                run,
+                "LWE.estimate",
+                params,
+                red_cost_model=red_cost_model,
+                red_shape_model=red_shape_model,
+                deny_list=sorted(deny_list),
+            )
         res = {
             algorithm: v
             for algorithm, attack in algorithms.items()
@@ -159,11 +324,19 @@ class Estimate:
             if f_name(attack) == k
         }
 
+        if deadline is not None:
+            for result in res.values():
+                if result is not None and "status" not in result:
+                    result["status"] = "converged"
+
         for algorithm in algorithms:
             if algorithm not in res:
                 continue
             result = res[algorithm]
-            if result["rop"] == oo:
+            if result.get("status") == "timeout":
+                print(f"{algorithm:20s} :: timed out")
+                continue
+            if result["rop"] == oo or result.get("status") == "pruned":
                 continue
             if algorithm == "bdd_hybrid" and res["bdd"]["rop"] <= result["rop"]:
                 continue
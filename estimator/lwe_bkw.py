@@ -2,7 +2,7 @@
 """
 See :ref:`Coded-BKW for LWE` for what is available.
 """
-from sage.all import ZZ, ceil, log, floor, sqrt, find_root, erf, oo, cached_function, RR
+from sage.all import ZZ, ceil, log, floor, sqrt, find_root, erf, oo, RR
 
 from .lwe_parameters import LWEParameters
 from .util import local_minimum
@@ -11,6 +11,7 @@ from .errors import InsufficientSamplesError
 from .prob import amplify_sigma
 from .nd import sigmaf
 from .io import Logging
+from .cache import cached
 
 cfft = 1  # convolutions mod q
 
@@ -27,7 +28,7 @@ class CodedBKW:
         return floor(b / (1 - log(12 * sigma_set**2 / 2**i, q) / 2))
 
     @staticmethod
-    @cached_function
+    @cached
     def ntest(n, ell, t1, t2, b, q):
         """
         If the parameter ``ntest`` is not provided, we use this function to estimate it.
@@ -209,7 +210,7 @@ class CodedBKW:
         cost = cost.reorder("rop", "m", "mem", "b", "t1", "t2")
         cost["tag"] = "coded-bkw"
         cost["problem"] = params
-        Logging.log("bkw", log_level + 1, f"{cost!r}")
+        Logging.log("bkw", log_level + 1, lambda: f"{cost!r}")
 
         return cost
 
@@ -225,11 +226,11 @@ class CodedBKW:
 
         # the outer search is over b, which determines the size of the tables: q^b
         b_max = 3 * ceil(log(params.q, 2))
-        with local_minimum(2, b_max, smallerf=sf) as it_b:
+        with local_minimum(2, b_max, smallerf=sf, params=params) as it_b:
             for b in it_b:
                 # the inner search is over t2, the number of coded steps
                 t2_max = max(3, params.n // b)
-                with local_minimum(2, t2_max, smallerf=sf) as it_t2:
+                with local_minimum(2, t2_max, smallerf=sf, params=params) as it_t2:
                     for t2 in it_t2:
                         y = cls.cost(b=b, t2=t2, ntest=ntest, params=params)
                         it_t2.update(y)
@@ -6,13 +6,16 @@ See :ref:`LWE Dual Attacks` for an introduction what is available.
 
 """
 
+import math
 from functools import partial
 from dataclasses import replace
 
-from sage.all import oo, ceil, sqrt, log, cached_function, RR, exp, pi, e, coth, tanh
+from sage.all import oo, ceil, RR, exp, pi, e, coth, tanh
 
+from . import numeric
+from .numeric import log, sqrt
 from .reduction import delta as deltaf
-from .util import local_minimum, early_abort_range
+from .util import local_minimum, early_abort_range, pattern_search
 from .cost import Cost
 from .lwe_parameters import LWEParameters
 from .prob import drop as prob_drop, amplify as prob_amplify
@@ -21,6 +24,7 @@ from .conf import red_cost_model as red_cost_model_default, mitm_opt as mitm_opt
 from .errors import OutOfBoundsError, InsufficientSamplesError
 from .nd import NoiseDistribution
 from .lwe_guess import exhaustive_search, mitm, distinguish
+from .cache import cached
 
 
 class DualHybrid:
@@ -29,7 +33,7 @@ class DualHybrid:
     """
 
     @staticmethod
-    @cached_function
+    @cached
     def dual_reduce(
         delta: float,
         params: LWEParameters,
@@ -107,7 +111,7 @@ class DualHybrid:
         return slv_params, m_
 
     @staticmethod
-    @cached_function
+    @cached
     def cost(
         solver,
         params: LWEParameters,
@@ -135,7 +139,7 @@ class DualHybrid:
             it merely reports costs.
 
         """
-        Logging.log("dual", log_level, f"β={beta}, ζ={zeta}, h1={h1}")
+        Logging.log("dual", log_level, lambda: f"β={beta}, ζ={zeta}, h1={h1}")
 
         delta = deltaf(beta)
 
@@ -145,7 +149,7 @@ class DualHybrid:
         params_slv, m_ = DualHybrid.dual_reduce(
             delta, params, zeta, h1, rho, t, log_level=log_level + 1
         )
-        Logging.log("dual", log_level + 1, f"red LWE instance: {repr(params_slv)}")
+        Logging.log("dual", log_level + 1, lambda: f"red LWE instance: {repr(params_slv)}")
 
         if t:
             cost = DualHybrid.fft_solver(params_slv, success_probability, t)
@@ -158,7 +162,7 @@ class DualHybrid:
 
         d = m_ + params.n - zeta
         _, cost_red, N, sieve_dim = red_cost_model.short_vectors(beta, d, cost["m"])
-        Logging.log("dual", log_level + 2, f"red: {Cost(rop=cost_red)!r}")
+        Logging.log("dual", log_level + 2, lambda: f"red: {Cost(rop=cost_red)!r}")
 
         # Add the runtime cost of sieving in dimension `sieve_dim` possibly multiple times.
         cost["rop"] += cost_red
@@ -173,7 +177,7 @@ class DualHybrid:
             raise RuntimeError(f"{d} < {params.n - zeta}, {params.n}, {zeta}, {m_}")
         cost["d"] = d
 
-        Logging.log("dual", log_level, f"{repr(cost)}")
+        Logging.log("dual", log_level, lambda: f"{repr(cost)}")
 
         rep = 1
         if params.Xs.is_sparse:
@@ -258,6 +262,7 @@ class DualHybrid:
         log_level=5,
         opt_step=8,
         fft=False,
+        hint=None,
     ):
         """
         Optimizes the cost of the dual hybrid attack over the block size β.
@@ -270,10 +275,12 @@ class DualHybrid:
         :param red_cost_model: How to cost lattice reduction
         :param opt_step: control robustness of optimizer
         :param fft: use the FFT distinguisher from [AC:GuoJoh21]_
+        :param hint: a cost whose β and `t` seed the searches.
 
         .. note :: This function assumes that the instance is normalized. ζ and h1 are fixed.
 
         """
+        hint = {} if hint is None else hint
 
         f_t = partial(
             DualHybrid.cost,
@@ -289,7 +296,7 @@ class DualHybrid:
         if fft is True:
 
             def f(beta):
-                with local_minimum(0, params.n - zeta) as it:
+                with local_minimum(0, params.n - zeta, params=params, hint=hint.get("t")) as it:
                     for t in it:
                         it.update(f_t(beta=beta, t=t))
                     return it.y
@@ -304,7 +311,7 @@ class DualHybrid:
         beta = beta_upper
         while beta == beta_upper:
             beta_upper *= 2
-            with local_minimum(40, beta_upper, opt_step) as it:
+            with local_minimum(40, beta_upper, opt_step, params=params, hint=hint.get("beta")) as it:
                 for beta in it:
                     it.update(f(beta=beta))
                 for beta in it.neighborhood:
@@ -317,6 +324,47 @@ class DualHybrid:
             cost["h1"] = h1
         return cost
 
+    @classmethod
+    def _optimize_blocksize_sparse(
+        cls,
+        solver,
+        params: LWEParameters,
+        zeta: int = 0,
+        success_probability: float = 0.99,
+        red_cost_model=red_cost_model_default,
+        log_level=None,
+        fft=False,
+        hint=None,
+    ):
+        """
+        Optimise the number of non-zero entries `h_1` among the ζ guessed ones, and the block size.
+
+        .. note :: This function assumes that the instance is normalized and the secret sparse. ζ is fixed.
+
+        """
+        h = params.Xs.get_hamming_weight(params.n)
+        h1_min = max(0, h - (params.n - zeta))
+        h1_max = min(zeta, h)
+        if h1_min == h1_max:
+            h1_max = h1_min + 1
+        Logging.log("dual", log_level, lambda: f"h1 ∈ [{h1_min},{h1_max}] (zeta={zeta})")
+        hint = {} if hint is None else hint
+        with local_minimum(h1_min, h1_max, log_level=log_level + 1, params=params, hint=hint.get("h1")) as it:
+            for h1 in it:
+                # ignoring fft on purpose for sparse secrets
+                cost = cls.optimize_blocksize(
+                    h1=h1,
+                    solver=solver,
+                    params=params,
+                    zeta=zeta,
+                    success_probability=success_probability,
+                    red_cost_model=red_cost_model,
+                    log_level=log_level + 2,
+                    hint=hint,
+                )
+                it.update(cost)
+            return it.y
+
     def __call__(
         self,
         solver,
@@ -326,6 +374,8 @@ class DualHybrid:
         opt_step=8,
         log_level=1,
         fft=False,
+        optimizer="nested",
+        hint=None,
     ):
         """
         Optimizes the cost of the dual hybrid attack (using the given solver) over
@@ -343,6 +393,10 @@ class DualHybrid:
         :param red_cost_model: How to cost lattice reduction
         :param opt_step: control robustness of optimizer
         :param fft: use the FFT distinguisher from [AC:GuoJoh21]_. (ignored for sparse secrets)
+        :param optimizer: "nested" searches over ζ, h1, β (and `t`) one inside the other, "joint" searches over all
+            of them at once using :func:`estimator.util.pattern_search`, which is much faster but may settle on a
+            slightly worse local minimum.
+        :param hint: a cost, e.g. for a neighbouring parameter set, whose ζ, h1, β and `t` seed the searches.
 
         The returned cost dictionary has the following entries:
 
@@ -376,6 +430,8 @@ class DualHybrid:
             rop: ≈2^130.1, mem: ≈2^127.0, m: 1144, k: 120, ↻: 1, β: 347, d: 2024, ζ: 144, tag: dual_mitm_hybrid
             >>> dual_hybrid(params, mitm_optimization="numerical")
             rop: ≈2^129.0, m: 1145, k: 1, mem: ≈2^131.0, ↻: 1, β: 346, d: 2044, ζ: 125, tag: dual_mitm_hybrid
+            >>> dual_hybrid(params, optimizer="joint")
+            rop: ≈2^103.2, mem: ≈2^97.4, m: 937, β: 250, d: 1919, ↻: 1, ζ: 42, tag: dual_hybrid
 
             >>> params = params.updated(Xs=ND.SparseTernary(params.n, 32))
             >>> LWE.dual(params)
@@ -424,43 +480,28 @@ class DualHybrid:
             t=False,
         )
 
-        Logging.log("dual", log_level, f"costing LWE instance: {repr(params)}")
+        Logging.log("dual", log_level, lambda: f"costing LWE instance: {repr(params)}")
 
         params = params.normalize()
 
         if params.Xs.is_sparse:
             Cost.register_impermanent(h1=False)
 
-            def _optimize_blocksize(
+        if optimizer == "joint":
+            cost = self._joint(
                 solver,
-                params: LWEParameters,
-                zeta: int = 0,
-                success_probability: float = 0.99,
-                red_cost_model=red_cost_model_default,
-                log_level=None,
-                fft=False,
-            ):
-                h = params.Xs.get_hamming_weight(params.n)
-                h1_min = max(0, h - (params.n - zeta))
-                h1_max = min(zeta, h)
-                if h1_min == h1_max:
-                    h1_max = h1_min + 1
-                Logging.log("dual", log_level, f"h1 ∈ [{h1_min},{h1_max}] (zeta={zeta})")
-                with local_minimum(h1_min, h1_max, log_level=log_level + 1) as it:
-                    for h1 in it:
-                        # ignoring fft on purpose for sparse secrets
-                        cost = self.optimize_blocksize(
-                            h1=h1,
-                            solver=solver,
-                            params=params,
-                            zeta=zeta,
-                            success_probability=success_probability,
-                            red_cost_model=red_cost_model,
-                            log_level=log_level + 2,
-                        )
-                        it.update(cost)
-                    return it.y
+                params,
+                success_probability=success_probability,
+                red_cost_model=red_cost_model,
+                log_level=log_level + 1,
+                fft=fft,
+                hint=hint,
+            )
+            cost["problem"] = params
+            return cost.sanity_check()
 
+        if params.Xs.is_sparse:
+            _optimize_blocksize = self._optimize_blocksize_sparse
         else:
             _optimize_blocksize = self.optimize_blocksize
 
@@ -472,11 +513,12 @@ class DualHybrid:
             red_cost_model=red_cost_model,
             log_level=log_level + 1,
             fft=fft,
+            hint=hint,
         )
 
-        with local_minimum(1, params.n - 1, opt_step) as it:
-            for zeta in it:
-                it.update(f(zeta=zeta))
+        hint = {} if hint is None else hint
+        with local_minimum(1, params.n - 1, opt_step, params=params, hint=hint.get("zeta")) as it:
+            it.run(f, "zeta")
             for zeta in it.neighborhood:
                 it.update(f(zeta=zeta))
             cost = it.y
@@ -484,6 +526,60 @@ class DualHybrid:
         cost["problem"] = params
         return cost.sanity_check()
 
+    @staticmethod
+    def _joint(solver, params, success_probability, red_cost_model, log_level, fft, hint=None):
+        """
+        Optimise over β, ζ and h1 (sparse secrets) or `t` (``fft``) jointly.
+
+        The landscape has several valleys in ζ, so we start a pattern search from a few values of ζ and keep the best,
+        unless we are given a ``hint`` to start from.
+        """
+        sparse = params.Xs.is_sparse
+        h = params.Xs.get_hamming_weight(params.n) if sparse else 0
+
+        def f(beta, zeta, h1=0, t=0):
+            if h1 > zeta or h - h1 > params.n - zeta or t > params.n - zeta:
+                return Cost(rop=oo)
+            cost = DualHybrid.cost(
+                solver,
+                params,
+                beta,
+                zeta=zeta,
+                h1=h1,
+                t=t,
+                success_probability=success_probability,
+                red_cost_model=red_cost_model,
+                log_level=log_level + 1,
+            )
+            if beta > cost.get("d", oo):
+                return Cost(rop=oo)
+            cost["zeta"] = zeta
+            if sparse:
+                cost["h1"] = h1
+            return cost
+
+        bounds = {"beta": (40, params.n + min(params.m, params.n)), "zeta": (1, params.n - 1)}
+        if sparse:
+            bounds["h1"] = (0, h + 1)
+        elif fft:
+            bounds["t"] = (0, params.n)
+
+        if hint is None:
+            starts = [{"zeta": zeta} for zeta in (1, params.n // 8, params.n // 4, params.n // 2)]
+            step = None
+        else:
+            starts = [{k: hint[k] for k in bounds if k in hint}]
+            step = {k: 4 for k in bounds}
+
+        best, evaluations = None, 0
+        for start in starts:
+            res = pattern_search(f, bounds, start=start, step=step, log_level=log_level + 1, params=params)
+            evaluations += res.evaluations
+            if best is None or res.y < best.y:
+                best = res
+        Logging.log("dual", log_level, lambda: f"{repr(best.y)} ({evaluations} evaluations)")
+        return best.y
+
 
 DH = DualHybrid()
 
@@ -535,6 +631,9 @@ class MATZOV:
         mu = 0.5
         k_lat = params.n - k_fft - k_enum  # p.15
 
+        if numeric.fast():
+            return RR(cls._log_Nf(params, m, beta_bkz, beta_sieve, k_enum, k_fft, p, mu, k_lat)).exp()
+
         # p.39
         lsigma_s = (
             params.Xe.stddev ** (m / (m + k_lat))
@@ -553,8 +652,31 @@ class MATZOV:
 
         return RR(N)
 
+    @classmethod
+    def _log_Nf(cls, params, m, beta_bkz, beta_sieve, k_enum, k_fft, p, mu, k_lat):
+        """
+        Natural logarithm of :meth:`Nf` in double precision.
+        """
+        d = m + k_lat
+        log_lsigma_s = (
+            m / d * log(params.Xe.stddev)
+            + k_lat / d * log(params.Xs.stddev * params.q)
+            + log(4 / 3.0) / 2
+            + log(beta_sieve / 2 / math.pi / math.e) / 2
+            + (d - beta_sieve) * log(deltaf(beta_bkz))
+        )
+        # this term overflows doubles for large lattices and small block sizes
+        return (
+            4 * RR(2 * (log_lsigma_s + math.log(math.pi) - log(params.q))).exp()
+            + k_fft / 3.0 * (float(params.Xs.stddev) * math.pi / p) ** 2
+            + log(k_enum * cls.Hf(params.Xs) + k_fft * log(p) + log(1 / mu))
+        )
+
     @staticmethod
     def Hf(Xs):
+        if numeric.fast():
+            alpha = (math.pi * float(Xs.stddev)) ** 2
+            return (0.5 + log(math.sqrt(2 * math.pi) * Xs.stddev) - log(math.tanh(alpha))) / math.log(2.0)
         return RR(
             1 / 2 + log(sqrt(2 * pi) * Xs.stddev) + log(coth(pi**2 * Xs.stddev**2))
         ) / log(2.0)
@@ -597,14 +719,25 @@ class MATZOV:
 
         H = cls.Hf(params.Xs)
 
-        coeff = 1 / (1 - exp(-1 / 2 / params.Xs.stddev**2))
-        tmp_alpha = pi**2 * params.Xs.stddev**2
-        tmp_a = exp(8 * tmp_alpha * exp(-2 * tmp_alpha) * tanh(tmp_alpha)).n(30)
-        T_guess = coeff * (
-            ((2 * tmp_a / sqrt(e)) ** k_enum)
-            * (2 ** (k_enum * H))
-            * (cls.T_fftf(k_fft, p) + cls.T_tablef(N))
-        )
+        if numeric.fast():
+            # the same as below, in the log domain
+            alpha = (math.pi * float(params.Xs.stddev)) ** 2
+            log_T_guess = (
+                -math.log(-math.expm1(-1 / 2 / float(params.Xs.stddev) ** 2))
+                + k_enum * (math.log(2) + 8 * alpha * math.exp(-2 * alpha) * math.tanh(alpha) - 0.5)
+                + k_enum * H * math.log(2)
+                + log(cls.T_fftf(k_fft, p) + cls.T_tablef(N))
+            )
+            T_guess = RR(log_T_guess).exp()
+        else:
+            coeff = 1 / (1 - exp(-1 / 2 / params.Xs.stddev**2))
+            tmp_alpha = pi**2 * params.Xs.stddev**2
+            tmp_a = exp(8 * tmp_alpha * exp(-2 * tmp_alpha) * tanh(tmp_alpha)).n(30)
+            T_guess = coeff * (
+                ((2 * tmp_a / sqrt(e)) ** k_enum)
+                * (2 ** (k_enum * H))
+                * (cls.T_fftf(k_fft, p) + cls.T_tablef(N))
+            )
 
         cost = Cost(rop=T_sample + T_guess, problem=params)
         cost["red"] = T_sample
@@ -625,6 +758,8 @@ class MATZOV:
         params: LWEParameters,
         red_cost_model=red_cost_model_default,
         log_level=1,
+        optimizer=None,
+        hint=None,
     ):
         """
         Optimizes cost of dual attack as presented in [MATZOV22]_.
@@ -633,6 +768,11 @@ class MATZOV:
 
         :param params: LWE parameters
         :param red_cost_model: How to cost lattice reduction
+        :param optimizer: "nested" searches over `p`, ζ, `t` and β one inside the other, "joint" searches over all
+            of them at once using :func:`estimator.util.pattern_search`, which is much faster but may settle on a
+            slightly worse local minimum. By default, "joint" if a ``hint`` is given and "nested" otherwise.
+        :param hint: a cost, e.g. for a neighbouring parameter set. The joint search starts from its `p`, ζ, `t` and
+            β, as far as present, the nested search only from its β.
 
         The returned cost dictionary has the following entries:
 
@@ -645,13 +785,29 @@ class MATZOV:
         - ``t``: Number of coordinates in FFT part mod `p`.
         - ``d``: Lattice dimension.
 
+        EXAMPLE::
+
+            >>> from estimator import *
+            >>> from estimator.lwe_dual import matzov
+            >>> matzov(schemes.Kyber512, optimizer="joint")
+            rop: ≈2^139.6, red: ≈2^139.6, guess: ≈2^134.5, β: 387, p: 4, ζ: 16, t: 36, β': 391, N: ≈2^81.0, m: 512
+
         """
         params = params.normalize()
 
+        if optimizer is None:
+            optimizer = "nested" if hint is None else "joint"
+        if optimizer == "joint":
+            return self._joint(params, red_cost_model=red_cost_model, log_level=log_level, hint=hint)
+
+        hint = {} if hint is None else hint
+
         for p in early_abort_range(2, params.q):
             for k_enum in early_abort_range(0, params.n, 5):
                 for k_fft in early_abort_range(0, params.n - k_enum[0], 5):
-                    with local_minimum(40, params.n, log_level=log_level + 4) as it:
+                    with local_minimum(
+                        40, params.n, log_level=log_level + 4, params=params, hint=hint.get("beta")
+                    ) as it:
                         for beta in it:
                             cost = self.cost(
                                 beta,
@@ -665,19 +821,41 @@ class MATZOV:
                         Logging.log(
                             "dual",
                             log_level + 3,
-                            f"t: {k_fft[0]}, {repr(it.y)}",
+                            lambda: f"t: {k_fft[0]}, {repr(it.y)}",
                         )
                         k_fft[1].update(it.y)
-                Logging.log("dual", log_level + 2, f"ζ: {k_enum[0]}, {repr(k_fft[1].y)}")
+                Logging.log("dual", log_level + 2, lambda: f"ζ: {k_enum[0]}, {repr(k_fft[1].y)}")
                 k_enum[1].update(k_fft[1].y)
-            Logging.log("dual", log_level + 1, f"p:{p[0]}, {repr(k_enum[1].y)}")
+            Logging.log("dual", log_level + 1, lambda: f"p:{p[0]}, {repr(k_enum[1].y)}")
             p[1].update(k_enum[1].y)
             # if t == 0 then p is irrelevant, so we early abort that loop if that's the case once we hit t==0 twice.
             if p[1].y["t"] == 0 and p[0] > 2:
                 break
-        Logging.log("dual", log_level, f"{repr(p[1].y)}")
+        Logging.log("dual", log_level, lambda: f"{repr(p[1].y)}")
         return p[1].y
 
+    def _joint(self, params, red_cost_model, log_level, hint=None):
+        def f(p, k_enum, k_fft, beta):
+            if k_enum + k_fft >= params.n:
+                return Cost(rop=oo)
+            return self.cost(beta, params, p=p, k_enum=k_enum, k_fft=k_fft, red_cost_model=red_cost_model)
+
+        bounds = {"p": (2, params.q), "k_enum": (0, params.n), "k_fft": (0, params.n), "beta": (40, params.n)}
+        start = {"p": 2, "k_enum": 0, "k_fft": 0, "beta": params.n // 2 + 40}
+        # like the nested search, walk `p` upwards from 2 instead of jumping around in [2, q)
+        step = {"p": 1}
+        # hints may come from other attacks or failed estimates, so we take what they have and search narrowly
+        # around it
+        hint = {} if hint is None else hint
+        for key, name, hint_step in (("p", "p", 1), ("zeta", "k_enum", 2), ("t", "k_fft", 2), ("beta", "beta", 4)):
+            if hint.get(key) not in (None, oo):
+                lo, hi = bounds[name]
+                start[name] = min(max(int(hint[key]), lo), hi - 1)
+                step[name] = hint_step
+        res = pattern_search(f, bounds, start=start, step=step, log_level=log_level + 1, params=params)
+        Logging.log("dual", log_level, lambda: f"{repr(res.y)} ({res.evaluations} evaluations)")
+        return res.y
+
 
 matzov = MATZOV()
 
@@ -716,6 +894,8 @@ def dual(
         d=False,
     )
 
+    params = params.normalize()
+
     ret = DH.optimize_blocksize(
         solver=distinguish,
         params=params,
@@ -739,6 +919,8 @@ def dual_hybrid(
     mitm_optimization=False,
     opt_step=8,
     fft=False,
+    optimizer="nested",
+    hint=None,
 ):
     """
     Dual hybrid attack from [INDOCRYPT:EspJouKha20]_.
@@ -750,6 +932,8 @@ def dual_hybrid(
            ``conf`` module is picked, ``False`` disables MITM.
     :param opt_step: Control robustness of optimizer.
     :param fft: use the FFT distinguisher from [AC:GuoJoh21]_. (ignored for sparse secrets)
+    :param optimizer: "nested" (default) or "joint", see :class:`DualHybrid`.
+    :param hint: a cost, e.g. for a neighbouring parameter set, to seed the searches with.
 
     The returned cost dictionary has the following entries:
 
@@ -781,6 +965,8 @@ def dual_hybrid(
         red_cost_model=red_cost_model,
         opt_step=opt_step,
         fft=fft,
+        optimizer=optimizer,
+        hint=hint,
     )
     if mitm_optimization:
         ret["tag"] = "dual_mitm_hybrid"
@@ -45,7 +45,7 @@ class guess_composition:
 
         max_zeta = min(floor(log(baseline_cost["rop"], base)), params.n)
 
-        with local_minimum(0, max_zeta, log_level=log_level) as it:
+        with local_minimum(0, max_zeta, log_level=log_level, params=params) as it:
             for zeta in it:
                 search_space = base**zeta
                 cost = f(params.updated(n=params.n - zeta), log_level=log_level + 1, **kwds)
@@ -104,7 +104,7 @@ class guess_composition:
         base = params.Xs.bounds[1] - params.Xs.bounds[0]  # we exclude zero
         h = ceil(len(params.Xs) * params.Xs.density)  # nr of non-zero entries
 
-        with local_minimum(0, params.n - 40, log_level=log_level) as it:
+        with local_minimum(0, params.n - 40, log_level=log_level, params=params) as it:
             for zeta in it:
                 single_cost = f(params.updated(n=params.n - zeta), log_level=log_level + 1, **kwds)
                 if single_cost["rop"] == oo:
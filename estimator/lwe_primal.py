@@ -7,21 +7,25 @@ See :ref:`LWE Primal Attacks` for an introduction what is available.
 """
 from functools import partial
 
-from sage.all import oo, ceil, sqrt, log, RR, ZZ, binomial, cached_function
+import numpy as np
+from sage.all import oo, ceil, RR, ZZ, binomial
+from .numeric import log, sqrt
 from .reduction import delta as deltaf
 from .reduction import cost as costf
-from .util import local_minimum
+from .util import local_minimum, pruning_threshold, suspend_bounds
 from .cost import Cost
 from .lwe_parameters import LWEParameters
 from .simulator import normalize as simulator_normalize
+from .simulator import log_profile
 from .prob import drop as prob_drop
 from .prob import amplify as prob_amplify
-from .prob import babai as prob_babai
-from .prob import mitm_babai_probability
+from .prob import log_babai as prob_log_babai
+from .prob import log_mitm_babai_probability
 from .io import Logging
 from .conf import red_cost_model as red_cost_model_default
 from .conf import red_shape_model as red_shape_model_default
 from .conf import red_simulator as red_simulator_default
+from .cache import cached
 
 
 class PrimalUSVP:
@@ -80,7 +84,7 @@ class PrimalUSVP:
         return m
 
     @staticmethod
-    @cached_function
+    @cached
     def cost_gsa(
         beta: int,
         params: LWEParameters,
@@ -122,7 +126,7 @@ class PrimalUSVP:
         return costf(red_cost_model, beta, d, predicate=lhs <= rhs)
 
     @staticmethod
-    @cached_function
+    @cached
     def cost_simulator(
         beta: int,
         params: LWEParameters,
@@ -143,7 +147,13 @@ class PrimalUSVP:
             tau = False
             d -= 1  # Remove extra dimension in homogeneous instances
 
-        r = simulator(d=d, n=params.n, q=params.q, beta=beta, xi=xi, tau=tau)
+        # the attack costs at least as much as lattice reduction, which we may already know to be too expensive
+        cost = costf(red_cost_model, beta, d)
+        if cost["rop"] >= pruning_threshold():
+            cost["status"] = "pruned"
+            return cost
+
+        r = log_profile(simulator, d=d, n=params.n, q=params.q, beta=beta, xi=xi, tau=tau)
 
         if not tau:
             lhs = params.Xe.stddev**2 * (beta - 1)
@@ -151,9 +161,11 @@ class PrimalUSVP:
         else:
             lhs = params.Xe.stddev**2 * (beta - 1) + tau**2
 
-        predicate = r[d - beta] > lhs
-
-        return costf(red_cost_model, beta, d, predicate=predicate)
+        # reuse the cost computed above, as `costf(..., predicate=False)` would
+        if not 2 * float(r[d - beta]) > log(lhs):
+            cost["red"] = oo
+            cost["rop"] = oo
+        return cost
 
     def __call__(
         self,
@@ -162,6 +174,7 @@ class PrimalUSVP:
         red_shape_model=red_shape_model_default,
         optimize_d=True,
         log_level=1,
+        hint=None,
         **kwds,
     ):
         """
@@ -171,6 +184,7 @@ class PrimalUSVP:
         :param red_cost_model: How to cost lattice reduction.
         :param red_shape_model: How to model the shape of a reduced basis.
         :param optimize_d: Attempt to find minimal d, too.
+        :param hint: A cost, e.g. for a neighbouring parameter set, whose β and d seed the searches.
         :return: A cost dictionary.
 
         The returned cost dictionary has the following entries:
@@ -197,16 +211,25 @@ class PrimalUSVP:
             >>> LWE.primal_usvp(params, red_shape_model=Simulator.CN11, optimize_d=False)
             rop: ≈2^87.6, red: ≈2^87.6, δ: 1.006114, β: 209, d: 400, tag: usvp
 
+        When sweeping over parameters, pass the cost of a neighbouring parameter set as a hint::
+
+            >>> cost = LWE.primal_usvp(params.updated(n=210))
+            >>> LWE.primal_usvp(params.updated(n=211), hint=cost)
+            rop: ≈2^90.3, red: ≈2^90.3, δ: 1.005937, β: 219, d: 395, tag: usvp
+
         The success condition was formulated in [USENIX:ADPS16]_ and studied/verified in
         [AC:AGVW17]_, [C:DDGR20]_, [PKC:PosVir21]_. The treatment of small secrets is from
         [ACISP:BaiGal14]_.
 
         """
         params = LWEParameters.normalize(params)
+        hint = {} if hint is None else hint
         # allow for a larger embedding lattice dimension: Bai and Galbraith
         m = params.m + params.n if params.Xs <= params.Xe else params.m
         if red_shape_model == "gsa":
-            with local_minimum(40, max(2 * params.n, 41), precision=5) as it:
+            with local_minimum(
+                40, max(2 * params.n, 41), precision=5, params=params, hint=hint.get("beta")
+            ) as it:
                 for beta in it:
                     cost = self.cost_gsa(
                         beta=beta, params=params, m=m, red_cost_model=red_cost_model, **kwds
@@ -228,13 +251,15 @@ class PrimalUSVP:
             pass
 
         # step 0. establish baseline
-        cost_gsa = self(
-            params,
-            red_cost_model=red_cost_model,
-            red_shape_model="gsa",
-        )
+        with suspend_bounds():
+            cost_gsa = self(
+                params,
+                red_cost_model=red_cost_model,
+                red_shape_model="gsa",
+                hint=hint,
+            )
 
-        Logging.log("usvp", log_level + 1, f"GSA: {repr(cost_gsa)}")
+        Logging.log("usvp", log_level + 1, lambda: f"GSA: {repr(cost_gsa)}")
 
         f = partial(
             self.cost_simulator,
@@ -249,20 +274,22 @@ class PrimalUSVP:
         with local_minimum(
             max(cost_gsa["beta"] - ceil(0.10 * cost_gsa["beta"]), 40),
             max(cost_gsa["beta"] + ceil(0.20 * cost_gsa["beta"]), 40),
+            params=params,
+            hint=hint.get("beta"),
         ) as it:
             for beta in it:
                 it.update(f(beta=beta, **kwds))
             cost = it.y
 
-        Logging.log("usvp", log_level, f"Opt-β: {repr(cost)}")
+        Logging.log("usvp", log_level, lambda: f"Opt-β: {repr(cost)}")
 
         if cost and optimize_d:
             # step 2. find d
-            with local_minimum(params.n, stop=cost["d"] + 1) as it:
+            with local_minimum(params.n, stop=cost["d"] + 1, params=params, hint=hint.get("d")) as it:
                 for d in it:
                     it.update(f(d=d, beta=cost["beta"], **kwds))
                 cost = it.y
-            Logging.log("usvp", log_level + 1, f"Opt-d: {repr(cost)}")
+            Logging.log("usvp", log_level + 1, lambda: f"Opt-d: {repr(cost)}")
 
         cost["tag"] = "usvp"
         cost["problem"] = params
@@ -284,39 +311,36 @@ class PrimalHybrid:
         """
         Return η for a given lattice shape and distance.
 
-        :param r: squared Gram-Schmidt norms
+        :param r: logarithms of Gram-Schmidt norms, see :func:`estimator.simulator.log_profile`
 
-        """
-        from math import lgamma, log, exp, pi
+        This is one more than the dimension of the largest projected sublattice whose Gaussian heuristic is smaller
+        than the expected length of the projected error.
+
+        EXAMPLE::
 
-        def ball_log_vol(n):
-            return (n / 2.0) * log(pi) - lgamma(n / 2.0 + 1)
+            >>> from estimator import ND
+            >>> from estimator.lwe_primal import PrimalHybrid
+            >>> from estimator.simulator import GSA, log_profile
+            >>> r = log_profile(GSA, 1000, 500, 3329, 400, dual=True)
+            >>> PrimalHybrid.svp_dimension(r, ND.DiscreteGaussian(3.2))
+            630
 
-        def gaussian_heuristic_log_input(r):
-            n = len(list(r))
-            log_vol = sum(r)
-            log_gh = 1.0 / n * (log_vol - 2 * ball_log_vol(n))
-            return exp(log_gh)
+        """
+        from scipy.special import gammaln
 
         d = len(r)
-        r = [log(x) for x in r]
-
-        if d > 4096:
-            for i, _ in enumerate(r):
-                # chosen since RC.ADPS16(1754, 1754).log(2.) = 512.168000000000
-                j = d - 1754 + i
-                if (j < d) and (gaussian_heuristic_log_input(r[j:]) < D.stddev**2 * (d - j)):
-                    return ZZ(d - (j - 1))
-            return ZZ(2)
+        # the projected sublattice starting at i has dimension n[i] and logarithm of the volume² log_vol[i]
+        n = np.arange(d, 0, -1)
+        log_vol = np.cumsum(2 * np.asarray(r, dtype=float)[::-1])[::-1]
+        ball_log_vol = (n / 2.0) * np.log(np.pi) - gammaln(n / 2.0 + 1)
+        found = (log_vol - 2 * ball_log_vol) / n < np.log(float(D.stddev) ** 2 * n)
 
-        else:
-            for i, _ in enumerate(r):
-                if gaussian_heuristic_log_input(r[i:]) < D.stddev**2 * (d - i):
-                    return ZZ(d - (i - 1))
+        if not found.any():
             return ZZ(2)
+        return ZZ(d - (int(np.argmax(found)) - 1))
 
     @staticmethod
-    @cached_function
+    @cached
     def cost(
         beta: int,
         params: LWEParameters,
@@ -358,9 +382,12 @@ class PrimalHybrid:
             tau = False
             d -= 1
 
-        r = simulator(d, params.n - zeta, params.q, beta, xi=xi, tau=tau, dual=True)
-
         bkz_cost = costf(red_cost_model, beta, d)
+        # the attack costs at least as much as lattice reduction, which we may already know to be too expensive
+        if bkz_cost["rop"] >= pruning_threshold():
+            return Cost(rop=bkz_cost["rop"], red=bkz_cost["rop"], beta=beta, zeta=zeta, d=d, status="pruned")
+
+        r = log_profile(simulator, d, params.n - zeta, params.q, beta, xi=xi, tau=tau, dual=True)
 
         # 2. Required SVP dimension η
         if babai:
@@ -405,13 +432,13 @@ class PrimalHybrid:
 
         if mitm and zeta > 0:
             if babai:
-                probability *= mitm_babai_probability(r, params.Xe.stddev, params.q)
+                probability *= log_mitm_babai_probability(r, params.Xe.stddev, params.q).exp()
             else:
                 # TODO: the probability in this case needs to be analysed
                 probability *= 1
 
         if eta <= 20 and d >= 0:  # NOTE: η: somewhat arbitrary bound, d: we may guess it all
-            probability *= RR(prob_babai(r, sqrt(d) * params.Xe.stddev))
+            probability *= prob_log_babai(r, sqrt(d) * params.Xe.stddev).exp()
 
         ret = Cost()
         ret["rop"] = bkz_cost["rop"] + svp_cost["rop"]
@@ -456,22 +483,25 @@ class PrimalHybrid:
         mitm: bool = True,
         optimize_d=True,
         log_level=5,
+        hint=None,
         **kwds,
     ):
         """
         This function optimizes costs for a fixed guessing dimension ζ.
         """
-
-        # step 0. establish baseline
-        baseline_cost = primal_usvp(
-            params,
-            red_shape_model=red_shape_model,
-            red_cost_model=red_cost_model,
-            optimize_d=False,
-            log_level=log_level + 1,
-            **kwds,
-        )
-        Logging.log("bdd", log_level, f"H0: {repr(baseline_cost)}")
+        hint = {} if hint is None else hint
+
+        # step 0. establish baseline, which bounds the search and so must not be pruned
+        with suspend_bounds():
+            baseline_cost = primal_usvp(
+                params,
+                red_shape_model=red_shape_model,
+                red_cost_model=red_cost_model,
+                optimize_d=False,
+                log_level=log_level + 1,
+                **kwds,
+            )
+        Logging.log("bdd", log_level, lambda: f"H0: {repr(baseline_cost)}")
 
         f = partial(
             cls.cost,
@@ -487,25 +517,32 @@ class PrimalHybrid:
 
         # step 1. optimize β
         with local_minimum(
-            40, baseline_cost["beta"] + 1, precision=2, log_level=log_level + 1
+            40,
+            baseline_cost["beta"] + 1,
+            precision=2,
+            log_level=log_level + 1,
+            params=params,
+            hint=hint.get("beta"),
         ) as it:
-            for beta in it:
-                it.update(f(beta))
+            it.run(f)
             for beta in it.neighborhood:
                 it.update(f(beta))
             cost = it.y
 
-        Logging.log("bdd", log_level, f"H1: {cost!r}")
+        Logging.log("bdd", log_level, lambda: f"H1: {cost!r}")
 
         # step 2. optimize d
         if cost and cost.get("tag", "XXX") != "usvp" and optimize_d:
             with local_minimum(
-                params.n, cost["d"] + cost["zeta"] + 1, log_level=log_level + 1
+                params.n,
+                cost["d"] + cost["zeta"] + 1,
+                log_level=log_level + 1,
+                params=params,
             ) as it:
                 for d in it:
                     it.update(f(beta=cost["beta"], d=d))
                 cost = it.y
-            Logging.log("bdd", log_level, f"H2: {cost!r}")
+            Logging.log("bdd", log_level, lambda: f"H2: {cost!r}")
 
         if cost is None:
             return Cost(rop=oo)
@@ -520,6 +557,7 @@ class PrimalHybrid:
         red_shape_model=red_shape_model_default,
         red_cost_model=red_cost_model_default,
         log_level=1,
+        hint=None,
         **kwds,
     ):
         """
@@ -529,6 +567,7 @@ class PrimalHybrid:
         :param zeta: Guessing dimension ζ ≥ 0.
         :param babai: Insist on Babai's algorithm for finding close vectors.
         :param mitm: Simulate MITM approach (√ of search space).
+        :param hint: A cost, e.g. for a neighbouring parameter set, whose ζ and β seed the searches.
         :return: A cost dictionary
 
         The returned cost dictionary has the following entries:
@@ -581,6 +620,7 @@ class PrimalHybrid:
             tag = "hybrid"
 
         params = LWEParameters.normalize(params)
+        hint = {} if hint is None else hint
 
         # allow for a larger embedding lattice dimension: Bai and Galbraith
         m = params.m + params.n if params.Xs <= params.Xe else params.m
@@ -596,10 +636,12 @@ class PrimalHybrid:
             mitm=mitm,
             m=m,
             log_level=log_level + 1,
+            hint=hint,
         )
 
         def find_zeta_max(params, red_cost_model):
-            usvp_cost = primal_usvp(params, red_cost_model=red_cost_model)["rop"]
+            with suspend_bounds():
+                usvp_cost = primal_usvp(params, red_cost_model=red_cost_model)["rop"]
             zeta_max = 1
             while zeta_max < params.n:
                 # TODO: once support_size() is supported for NTRU, remove the below try/except
@@ -614,7 +656,9 @@ class PrimalHybrid:
 
         if zeta is None:
             zeta_max = find_zeta_max(params, red_cost_model)
-            with local_minimum(0, min(zeta_max, params.n), log_level=log_level) as it:
+            with local_minimum(
+                0, min(zeta_max, params.n), log_level=log_level, params=params, hint=hint.get("zeta")
+            ) as it:
                 for zeta in it:
                     it.update(
                         f(
@@ -152,11 +152,11 @@ class NoiseDistribution:
         EXAMPLE::
 
             >>> from estimator.nd import NoiseDistribution as ND
-            >>> hash(ND(3.0, 1.0)) == hash((3.0, 1.0, None))
+            >>> hash(ND(3.0, 1.0)) == hash((3.0, 1.0, None, (None, None), 1.0, ""))
             True
 
         """
-        return hash((self.stddev, self.mean, self.n))
+        return hash((self.stddev, self.mean, self.n, self.bounds, self.density, self.tag))
 
     def __len__(self):
         """
@@ -14,7 +14,8 @@ from .gb import arora_gb  # noqa
 from .ntru_parameters import NTRUParameters as Parameters  # noqa
 from .conf import (red_cost_model as red_cost_model_default,
                    red_shape_model as red_shape_model_default)
-from .util import batch_estimate, f_name
+from .util import batch_estimate, decide, f_name
+from .cache import cached_estimate
 from .reduction import RC
 
 
@@ -61,10 +62,13 @@ class Estimate:
                 primal_hybrid, red_cost_model=RC.ADPS16, red_shape_model="zgsa"
             )
 
-        res_raw = batch_estimate(
-            params, algorithms.values(), log_level=1, jobs=jobs, catch_exceptions=catch_exceptions
-        )
-        res_raw = res_raw[params]
+        def run():
+            res_raw = batch_estimate(
+                params, algorithms.values(), log_level=1, jobs=jobs, catch_exceptions=catch_exceptions
+            )
+            return res_raw[params]
+
+        res_raw = cached_estimate(run, "NTRU.estimate.rough", params)
         res = {
             algorithm: v for algorithm, attack in algorithms.items()
             for k, v in res_raw.items()
@@ -80,6 +84,79 @@ class Estimate:
 
         return res
 
+    def _algorithms(self, params, red_cost_model, red_shape_model, deny_list, add_list):
+        algorithms = {}
+
+        algorithms["usvp"] = partial(
+            primal_usvp, red_cost_model=red_cost_model, red_shape_model=red_shape_model
+        )
+        algorithms["dsd"] = partial(
+            primal_dsd, red_cost_model=red_cost_model, red_shape_model=red_shape_model
+        )
+
+        algorithms["bdd"] = partial(
+            primal_bdd, red_cost_model=red_cost_model, red_shape_model=red_shape_model
+        )
+        algorithms["bdd_hybrid"] = partial(
+            primal_hybrid,
+            mitm=False,
+            babai=False,
+            red_cost_model=red_cost_model,
+            red_shape_model=red_shape_model,
+        )
+        # we ignore the case of mitm=True babai=False for now, due to it being overly-optimistic
+        algorithms["bdd_mitm_hybrid"] = partial(
+            primal_hybrid,
+            mitm=True,
+            babai=True,
+            red_cost_model=red_cost_model,
+            red_shape_model=red_shape_model,
+        )
+
+        algorithms = {k: v for k, v in algorithms.items() if k not in deny_list}
+        algorithms.update(add_list)
+        return algorithms
+
+    def at_least(
+        self,
+        params,
+        lambda_bits,
+        red_cost_model=red_cost_model_default,
+        red_shape_model=red_shape_model_default,
+        deny_list=tuple(),
+        add_list=tuple(),
+        catch_exceptions=True,
+    ):
+        """
+        Decide if all attacks cost at least `2^λ`.
+
+        Attacks run one after another. Each attack stops optimising as soon as it finds a cost below `2^λ` and then
+        all remaining attacks are skipped.
+
+        :param params: NTRU parameters.
+        :param lambda_bits: security level `λ`.
+        :param red_cost_model: How to cost lattice reduction.
+        :param red_shape_model: How to model the shape of a reduced basis (applies to primal attacks)
+        :param deny_list: skip these algorithms
+        :param add_list: add these ``(name, function)`` pairs to the list of algorithms to estimate.
+        :param catch_exceptions: When an estimate fails, just print a warning.
+        :returns: ``(secure, attack, cost)`` which is truthy iff the instance is secure. If it is not, ``attack`` and
+            ``cost`` are a witness, else they are the cheapest attack found.
+
+        EXAMPLE ::
+
+            >>> from estimator import *
+            >>> NTRU.estimate.at_least(schemes.NTRUHRSS701Enc, 165)
+            Decision(secure=False, attack='usvp', cost=rop: ≈2^164.6, red: ≈2^164.6, δ: 1.003504, β: 480, d: 1179)
+            >>> bool(NTRU.estimate.at_least(schemes.NTRUHRSS701Enc, 128, deny_list=("bdd_hybrid", "bdd_mitm_hybrid")))
+            True
+
+        """
+        params = params.normalize()
+
+        algorithms = self._algorithms(params, red_cost_model, red_shape_model, deny_list, add_list)
+        return decide(params, algorithms, 2**lambda_bits, catch_exceptions=catch_exceptions)
+
     def __call__(
         self,
         params,
@@ -89,6 +166,9 @@ class Estimate:
         add_list=tuple(),
         jobs=1,
         catch_exceptions=True,
+        timeout=None,
+        deadline=None,
+        profile=False,
     ):
         """
         Run all estimates.
@@ -100,6 +180,13 @@ class Estimate:
         :param add_list: add these ``(name, function)`` pairs to the list of algorithms to estimate.a
         :param jobs: Use multiple threads in parallel.
         :param catch_exceptions: When an estimate fails, just print a warning.
+        :param timeout: Give up on an algorithm after this many seconds, either a number or a dictionary mapping
+            algorithm names to seconds.
+        :param deadline: Return the best costs found so far after about this many seconds. Costs are then flagged
+            with ``status`` either "converged" or "partial", the latter also giving the ``bracket`` the search was
+            narrowed down to when it was cut short.
+        :param profile: Attach the resources each algorithm took to estimate to its cost as ``profile``, see
+            :class:`estimator.util.Profile`. Profiled estimates bypass the persistent cache.
 
         EXAMPLE ::
 
@@ -120,51 +207,55 @@ class Estimate:
         """
         params = params.normalize()
 
-        algorithms = {}
-
-        algorithms["usvp"] = partial(
-            primal_usvp, red_cost_model=red_cost_model, red_shape_model=red_shape_model
-        )
-        algorithms["dsd"] = partial(
-            primal_dsd, red_cost_model=red_cost_model, red_shape_model=red_shape_model
-        )
-
-        algorithms["bdd"] = partial(
-            primal_bdd, red_cost_model=red_cost_model, red_shape_model=red_shape_model
-        )
-        algorithms["bdd_hybrid"] = partial(
-            primal_hybrid,
-            mitm=False,
-            babai=False,
-            red_cost_model=red_cost_model,
-            red_shape_model=red_shape_model,
-        )
-        # we ignore the case of mitm=True babai=False for now, due to it being overly-optimistic
-        algorithms["bdd_mitm_hybrid"] = partial(
-            primal_hybrid,
-            mitm=True,
-            babai=True,
-            red_cost_model=red_cost_model,
-            red_shape_model=red_shape_model,
-        )
-
-        algorithms = {k: v for k, v in algorithms.items() if k not in deny_list}
-        algorithms.update(add_list)
-
-        res_raw = batch_estimate(
-            params, algorithms.values(), log_level=1, jobs=jobs, catch_exceptions=catch_exceptions
-        )
-        res_raw = res_raw[params]
+        algorithms = self._algorithms(params, red_cost_model, red_shape_model, deny_list, add_list)
+
+        if isinstance(timeout, dict):
+            timeout = {f_name(algorithms[k]): v for k, v in timeout.items() if k in algorithms}
+
+        def run():
+            res_raw = batch_estimate(
+                params,
+                algorithms.values(),
+                log_level=1,
+                jobs=jobs,
+                catch_exceptions=catch_exceptions,
+                timeout=timeout,
+                deadline=deadline,
+                profile=profile,
+            )
+            return res_raw[params]
+
+        if add_list or profile:
+            # user supplied functions cannot be keyed reliably and cached estimates take no time
+            res_raw = run()
+        else:
+            res_raw = cached_estimate(
+                run,
+                "NTRU.estimate",
+                params,
+                red_cost_model=red_cost_model,
+                red_shape_model=red_shape_model,
+                deny_list=sorted(deny_list),
+            )
         res = {
             algorithm: v
             for algorithm, attack in algorithms.items()
             for k, v in res_raw.items()
             if f_name(attack) == k
         }
+
+        if deadline is not None:
+            for result in res.values():
+                if result is not None and "status" not in result:
+                    result["status"] = "converged"
+
         for algorithm in algorithms:
             if algorithm not in res:
                 continue
             result = res[algorithm]
+            if result.get("status") == "timeout":
+                print(f"{algorithm:20s} :: timed out")
+                continue
             if result["rop"] == oo:
                 continue
             if algorithm == "hybrid" and res["bdd"]["rop"] < result["rop"]:
@@ -5,7 +5,7 @@ Estimate cost of solving LWE using primal attacks.
 See :ref:`LWE Primal Attacks` for an introduction what is available.
 
 """
-from sage.all import oo, log, RR, cached_function, exp, pi, floor, euler_gamma
+from sage.all import oo, log, RR, exp, pi, floor, euler_gamma
 from math import lgamma
 from scipy.special import digamma
 from .reduction import cost as costf
@@ -13,11 +13,13 @@ from .util import zeta_precomputed, zeta_prime_precomputed, gh_constant
 from .lwe_primal import PrimalUSVP, PrimalHybrid
 from .ntru_parameters import NTRUParameters
 from .simulator import normalize as simulator_normalize
-from .prob import conditional_chi_squared, chisquared_table
+from .simulator import log_profile
+from .prob import conditional_chi_squared, chisquared_cdf
 from .io import Logging
 from .conf import red_cost_model as red_cost_model_default
 from .conf import red_shape_model as red_shape_model_default
 from .conf import max_n_cache
+from .cache import cached
 
 
 class PrimalDSD():
@@ -25,7 +27,7 @@ class PrimalDSD():
     Estimate cost of solving (overstretched) NTRU via dense sublattice discovery
     """
     @staticmethod
-    @cached_function
+    @cached
     def ball_log_vol(n):
         return RR((n/2.)) * RR(log(pi)) - RR(lgamma(n/2. + 1))
 
@@ -55,7 +57,7 @@ class PrimalDSD():
         return lambda0+lambdai
 
     @staticmethod
-    @cached_function
+    @cached
     def DSL_logvol(n, sigmasq, ntru="circulant"):
         if ntru=="matrix":
             return PrimalDSD.DSL_logvol_matrix(n, sigmasq)
@@ -67,7 +69,7 @@ class PrimalDSD():
         raise ValueError(f"NTRU type: {ntru} is not supported.")
 
     @staticmethod
-    @cached_function
+    @cached
     def proj_logloss(d, k):
         # log loss of length when projecting out k dimension out of d
         return (RR(digamma((d-k)/2.))-RR(digamma(d/2.)))/2.
@@ -96,7 +98,7 @@ class PrimalDSD():
         return vols
 
     @staticmethod
-    @cached_function
+    @cached
     def prob_dsd(
         beta: int,
         params: NTRUParameters,
@@ -116,7 +118,7 @@ class PrimalDSD():
         if dsl_logvol is None:
             dsl_logvol = PrimalDSD.DSL_logvol(params.n, params.Xs.stddev**2, ntru=params.ntru_type)
 
-        B_shape = [log(r_)/2 for r_ in simulator(d, params.n, params.q, beta, xi=xi, tau=tau)]
+        B_shape = log_profile(simulator, d, params.n, params.q, beta, xi=xi, tau=tau).tolist()
         dsli_vols = PrimalDSD.DSLI_vols(dsl_logvol, B_shape)
         prob_all_not = RR(1.)
         prob_pos = (2*params.n)*[RR(0)]
@@ -131,7 +133,7 @@ class PrimalDSD():
                 continue
 
             norm_threshold = exp(2*(B_shape[s-beta]))/sigma_sq
-            proba_one = chisquared_table[beta].cum_distribution_function(norm_threshold)
+            proba_one = chisquared_cdf(beta, norm_threshold)
 
             if proba_one <= 10e-8:
                 continue
@@ -149,7 +151,7 @@ class PrimalDSD():
 
             prob_pos[s-beta] = proba_one
             prob_all_not *= max(1.-proba_one, 0.)
-            Logging.log("dsd", log_level+1, f"Pr[dsd, {beta}] = {prob_all_not}")
+            Logging.log("dsd", log_level+1, lambda: f"Pr[dsd, {beta}] = {prob_all_not}")
 
         return RR(1.-prob_all_not), prob_pos
 
@@ -236,7 +238,9 @@ class PrimalDSD():
                         total_DSD_prob += remaining_proba * prob_pos
                         remaining_proba *= (1.-prob_pos)
 
-                Logging.log("dsd", log_level+1, "β= %d,\t pr=%.4e, \t rem-pr=%.4e"%(beta, DSD_prob, remaining_proba))
+                Logging.log(
+                    "dsd", log_level+1, lambda: "β= %d,\t pr=%.4e, \t rem-pr=%.4e"%(beta, DSD_prob, remaining_proba)
+                )
             if remaining_proba < 0.001:
                 average_beta += beta * remaining_proba
                 break
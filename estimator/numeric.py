@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Elementary functions for cost formulas.
+
+By default, cost formulas are evaluated with Sage's exact and arbitrary precision arithmetic, which reproduces
+published numbers. Most of these formulas are tiny, so creating and coercing Sage objects dominates their
+runtime. With ``conf.fast_numeric`` set, or within :func:`estimator.util.fast_numeric`, the functions in this
+module and the cost formulas calling them evaluate in double precision instead::
+
+    >>> from estimator import numeric
+    >>> from estimator.util import fast_numeric
+    >>> numeric.log(2**2048, 2)
+    2048
+    >>> with fast_numeric():
+    ...     numeric.log(2**2048, 2)
+    2048.0
+
+Costs are still reported as elements of ``RR``, large quantities are computed in the log domain before converting
+them. Estimates in either mode agree to within 0.01 bits, except where the search for the optimal parameters
+settles differently on a flat cost landscape.
+"""
+import math
+import numbers
+
+from sage.all import RR, log as sage_log, sqrt as sage_sqrt
+
+
+def fast():
+    """
+    Return ``True`` if cost formulas are evaluated in double precision.
+    """
+    from . import conf  # conf imports modules using this one
+
+    return conf.fast_numeric
+
+
+def _ln(x):
+    if isinstance(x, numbers.Integral):
+        # Python integers of any size are supported, while converting large Sage integers to floats overflows
+        return math.log(int(x))
+    y = math.log(x)
+    if y == math.inf:
+        return float(RR(x).log())
+    return y
+
+
+def log(x, base=None):
+    """
+    Logarithm of ``x`` to ``base``, the natural logarithm by default.
+
+    :param x: a positive number.
+    :param base: the base of the logarithm.
+
+    """
+    if not fast():
+        return sage_log(x) if base is None else sage_log(x, base)
+    return _ln(x) if base is None else _ln(x) / _ln(base)
+
+
+def sqrt(x):
+    """
+    Square root of ``x``.
+
+    :param x: a non-negative number.
+
+    """
+    if not fast():
+        return sage_sqrt(x)
+    try:
+        return math.sqrt(int(x) if isinstance(x, numbers.Integral) else x)
+    except OverflowError:
+        return RR(x).sqrt()
@@ -1,13 +1,40 @@
 # -*- coding: utf-8 -*-
+import numpy as np
 from sage.all import binomial, ZZ, log, ceil, RealField, oo, exp, pi
 from sage.all import RealDistribution, RR, sqrt, prod, erf
+from scipy.special import betainc, chdtr
+from scipy.special import erf as erf_array
 from .nd import sigmaf
-from .conf import max_n_cache
+from .util import LazyEvaluation
+from .conf import max_n_cache, chisquared_cache_size
 
 
-chisquared_table = {i: None for i in range(2*max_n_cache+1)}
-for i in range(2*max_n_cache+1):
-    chisquared_table[i] = RealDistribution('chisquared', i)
+# χ² distributions are built on first use for each degree of freedom
+chisquared_table = LazyEvaluation(
+    lambda i: RealDistribution("chisquared", i), 2 * max_n_cache, maxsize=chisquared_cache_size
+)
+
+
+def chisquared_cdf(k, x):
+    """
+    Cumulative distribution function of the χ² distribution with ``k`` degrees of freedom at ``x``.
+
+    This evaluates in double precision without constructing a distribution object and agrees with
+    ``chisquared_table[k].cum_distribution_function(x)``.
+
+    :param k: Degrees of freedom.
+    :param x: Point at which to evaluate the CDF.
+
+    EXAMPLE::
+
+        >>> from estimator import prob
+        >>> prob.chisquared_cdf(100, 105)
+        0.6535...
+        >>> abs(prob.chisquared_cdf(100, 105) - prob.chisquared_table[100].cum_distribution_function(105)) < 1e-12
+        True
+
+    """
+    return float(chdtr(float(k), float(x)))
 
 
 def conditional_chi_squared(d1, d2, lt, l2):
@@ -20,28 +47,29 @@ def conditional_chi_squared(d1, d2, lt, l2):
     :param lt: Length threshold (maximum length of whole vector)
     :param l2: Length threshold for the first d2 coordinates.
 
+    The integral over the length of the first d2 coordinates is approximated by the midpoint rule on
+    ``5*(d1+d2)`` intervals, evaluating all CDFs in one call each.
+
     EXAMPLE::
         >>> from estimator import prob
         >>> prob.conditional_chi_squared(100, 5, 105, 1)
-        0.6358492948586715
+        0.63584929485867...
 
         >>> prob.conditional_chi_squared(100, 5, 105, 5)
-        0.5764336909205551
+        0.57643369092055...
 
         >>> prob.conditional_chi_squared(100, 5, 105, 10)
-        0.5351747076352109
+        0.53517470763521...
 
         >>> prob.conditional_chi_squared(100, 5, 50, 10)
-        1.1707597206287592e-06
+        1.17075972062...e-06
 
         >>> prob.conditional_chi_squared(100, 5, 50, .7)
-        5.4021875103989546e-06
+        5.40218751039...e-06
     """
-    D1 = chisquared_table[d1].cum_distribution_function
-    D2 = chisquared_table[d2].cum_distribution_function
-    l2 = RR(l2)
+    l2, lt = float(l2), float(lt)
 
-    PE2 = D2(l2)
+    PE2 = chdtr(d2, l2)
     # In large dim, we can get underflow leading to NaN
     # When this happens, assume lifting is successfully (underestimating security)
     if PE2==0:
@@ -50,18 +78,11 @@ def conditional_chi_squared(d1, d2, lt, l2):
     steps = 5 * (d1 + d2)
 
     # Numerical computation of the integral
-    proba = 0.
-    for i in range(steps)[::-1]:
-        l2_min = i * l2 / steps
-        l2_mid = (i + .5) * l2 / steps
-        l2_max = (i + 1) * l2 / steps
-
-        PC2 = (D2(l2_max) - D2(l2_min)) / PE2
-        PE1 = D1(lt - l2_mid)
-
-        proba += PC2 * PE1
+    i = np.arange(steps + 1)
+    PC2 = np.diff(chdtr(d2, i * l2 / steps)) / PE2
+    PE1 = chdtr(d1, np.maximum(lt - (i[:-1] + .5) * l2 / steps, 0))
 
-    return proba
+    return float(np.dot(PC2, PE1))
 
 
 def gaussian_cdf(mu, sigma, t):
@@ -78,6 +99,11 @@ def gaussian_cdf(mu, sigma, t):
     return RR((1/2)*(1 + erf((t - mu)/(sqrt(2)*sigma))))
 
 
+def _log_norms(r):
+    # logarithms of the Gram-Schmidt norms from their squares, which may exceed the range of floats
+    return np.array([float(RR(r_).log()) for r_ in r]) / 2
+
+
 def mitm_babai_probability(r, stddev, q, fast=False):
     """
     Compute the "e-admissibility" probability associated to the mitm step, according to
@@ -96,28 +122,84 @@ def mitm_babai_probability(r, stddev, q, fast=False):
         # overestimate the probability -> underestimate security
         return 1
 
-    # get non-squared norms
-    alphaq = sigmaf(stddev)
-    probs = (
-        RR(
-            erf(s * sqrt(RR(pi)) / alphaq)
-            + (alphaq / s) * ((exp(-s * sqrt(RR(pi)) / alphaq) - 1) / RR(pi))
-        )
-        for s in map(sqrt, r)
-    )
-    p = RR(prod(probs))
-    return p if 0 <= p <= 1 else 0.0
+    return log_mitm_babai_probability(_log_norms(r), stddev, q).exp()
+
+
+def log_mitm_babai_probability(r, stddev, q):
+    """
+    Natural logarithm of :func:`mitm_babai_probability`, computed from the logarithms of the Gram-Schmidt norms.
+
+    The probability is a product of one factor per norm, we sum their logarithms, so it does not underflow.
+
+    :params r: logarithms of the GSO lengths, see :func:`estimator.simulator.log_profile`
+    :params stddev: the std.dev of the error distribution
+    :params q: the LWE modulus
+    :return: logarithm of the probability as an element of ``RR``, ``-oo`` if the model fails
+
+    EXAMPLE::
+
+        >>> import numpy as np
+        >>> from estimator import prob
+        >>> from estimator.nd import sigmaf
+        >>> from estimator.simulator import GSA, log_profile
+        >>> from sage.all import RR, erf, exp, pi, prod, sqrt
+        >>> r = log_profile(GSA, 400, 256, 3329, 300)
+        >>> alphaq = sigmaf(3.2)
+        >>> p = prod(
+        ...     RR(erf(s * sqrt(RR(pi)) / alphaq) + (alphaq / s) * ((exp(-s * sqrt(RR(pi)) / alphaq) - 1) / RR(pi)))
+        ...     for s in map(sqrt, GSA(400, 256, 3329, 300)))
+        >>> abs(prob.log_mitm_babai_probability(r, 3.2, 3329) / p.log() - 1) < 1e-9
+        True
+
+    """
+    u = np.exp(np.asarray(r, dtype=float)) * (np.sqrt(np.pi) / float(sigmaf(stddev)))
+    probs = erf_array(u) + np.expm1(-u) / (np.sqrt(np.pi) * u)
+
+    # the product may be positive even though some factors are not, see the note on mitm_babai_probability
+    if (probs == 0).any() or np.count_nonzero(probs < 0) % 2:
+        return RR(-oo)
+    log_p = RR(np.log(np.abs(probs)).sum())
+    return log_p if log_p <= 0 else RR(-oo)
 
 
 def babai(r, norm):
     """
     Babai probability following [EPRINT:Wun16]_.
 
+    :param r: squared Gram-Schmidt norms
+    :param norm: length of the target vector
+
+    """
+    return log_babai(_log_norms(r), norm).exp()
+
+
+def log_babai(r, norm):
+    """
+    Natural logarithm of :func:`babai`, computed from the logarithms of the Gram-Schmidt norms.
+
+    The probability is a product of one factor per norm, we sum their logarithms, so it does not underflow.
+
+    :param r: logarithms of Gram-Schmidt norms, see :func:`estimator.simulator.log_profile`
+    :param norm: length of the target vector
+    :return: logarithm of the probability as an element of ``RR``
+
+    EXAMPLE::
+
+        >>> from estimator import prob
+        >>> from estimator.simulator import GSA, log_profile
+        >>> from sage.all import RealDistribution, prod, RR
+        >>> r = log_profile(GSA, 400, 256, 3329, 300)
+        >>> T = RealDistribution("beta", ((400 - 1) / 2, 1.0 / 2))
+        >>> p = prod([1 - T.cum_distribution_function(1 - r_ / (2 * 40.0) ** 2) for r_ in GSA(400, 256, 3329, 300)])
+        >>> abs(prob.log_babai(r, 40.0) / RR(p).log() - 1) < 1e-9
+        True
+
     """
-    denom = float(2 * norm) ** 2
-    T = RealDistribution("beta", ((len(r) - 1) / 2, 1.0 / 2))
-    probs = [1 - T.cum_distribution_function(1 - r_ / denom) for r_ in r]
-    return prod(probs)
+    r = np.asarray(r, dtype=float)
+    # 1 - I_{1-x}(a, 1/2) = I_x(1/2, a) for the regularized incomplete β function I and x = r_i² / (2·norm)²
+    x = np.exp(np.minimum(2 * r - 2 * np.log(2 * float(norm)), 0))
+    with np.errstate(divide="ignore"):
+        return RR(np.log(betainc(0.5, (len(r) - 1) / 2, x)).sum())
 
 
 def drop(n, h, k, fail=0, rotations=False):
@@ -3,9 +3,12 @@
 Cost estimates for lattice redution.
 """
 
+import math
+
 from sage.all import ZZ, RR, pi, e, find_root, ceil, floor, log, oo, round, sqrt
 from scipy.optimize import newton
 
+from . import numeric
 from .cost import Cost
 
 
@@ -65,6 +68,10 @@ class ReductionCost:
             (40, 1.01295),
         )
 
+        if beta > 40 and numeric.fast():
+            beta = float(beta)
+            return (beta / (2 * math.pi * math.e) * (math.pi * beta) ** (1 / beta)) ** (1 / (2 * (beta - 1)))
+
         if beta <= 2:
             return RR(1.0219)
         elif beta < 40:
@@ -420,7 +427,7 @@ class BDGL16(ReductionCost):
             222.9
 
         """
-        return cls.LLL(d, B) + ZZ(2) ** RR(0.387 * beta + 16.4 + log(cls.svp_repeat(beta, d), 2))
+        return cls.LLL(d, B) + ZZ(2) ** RR(0.387 * beta + 16.4 + numeric.log(cls.svp_repeat(beta, d), 2))
 
     @classmethod
     def _asymptotic(cls, beta, d, B=None):
@@ -439,7 +446,7 @@ class BDGL16(ReductionCost):
             175.4
         """
         # TODO we simply pick the same additive constant 16.4 as for the experimental result in [SODA:BDGL16]_
-        return cls.LLL(d, B) + ZZ(2) ** RR(0.292 * beta + 16.4 + log(cls.svp_repeat(beta, d), 2))
+        return cls.LLL(d, B) + ZZ(2) ** RR(0.292 * beta + 16.4 + numeric.log(cls.svp_repeat(beta, d), 2))
 
     def __call__(self, beta, d, B=None):
         """
@@ -485,7 +492,7 @@ class LaaMosPol14(ReductionCost):
 
         """
         return self.LLL(d, B) + ZZ(2) ** RR(
-            (0.265 * beta + 16.4 + log(self.svp_repeat(beta, d), 2))
+            (0.265 * beta + 16.4 + numeric.log(self.svp_repeat(beta, d), 2))
         )
 
 
@@ -530,10 +537,10 @@ class CheNgu12(ReductionCost):
         """
         repeat = self.svp_repeat(beta, d)
         cost = RR(
-            0.270188776350190 * beta * log(beta)
+            0.270188776350190 * beta * numeric.log(beta)
             - 1.0192050451318417 * beta
             + 16.10253135200765
-            + log(100, 2)
+            + numeric.log(100, 2)
         )
         return self.LLL(d, B) + repeat * ZZ(2) ** cost
 
@@ -558,9 +565,9 @@ class ABFKSW20(ReductionCost):
 
         """
         if 1.5 * beta >= d or beta <= 92:  # 1.5β is a bit arbitrary, β≤92 is the crossover point
-            cost = RR(0.1839 * beta * log(beta, 2) - 0.995 * beta + 16.25 + log(64, 2))
+            cost = RR(0.1839 * beta * numeric.log(beta, 2) - 0.995 * beta + 16.25 + numeric.log(64, 2))
         else:
-            cost = RR(0.125 * beta * log(beta, 2) - 0.547 * beta + 10.4 + log(64, 2))
+            cost = RR(0.125 * beta * numeric.log(beta, 2) - 0.547 * beta + 10.4 + numeric.log(64, 2))
 
         repeat = self.svp_repeat(beta, d)
 
@@ -587,9 +594,9 @@ class ABLR21(ReductionCost):
 
         """
         if 1.5 * beta >= d or beta <= 97:  # 1.5β is a bit arbitrary, 97 is the crossover
-            cost = RR(0.1839 * beta * log(beta, 2) - 1.077 * beta + 29.12 + log(64, 2))
+            cost = RR(0.1839 * beta * numeric.log(beta, 2) - 1.077 * beta + 29.12 + numeric.log(64, 2))
         else:
-            cost = RR(0.1250 * beta * log(beta, 2) - 0.654 * beta + 25.84 + log(64, 2))
+            cost = RR(0.1250 * beta * numeric.log(beta, 2) - 0.654 * beta + 25.84 + numeric.log(64, 2))
 
         repeat = self.svp_repeat(beta, d)
 
@@ -727,6 +734,9 @@ class Kyber(ReductionCost):
             42.597...
 
         """
+        if numeric.fast():
+            beta = float(beta)
+            return max(beta * math.log(4 / 3.0) / math.log(beta / (2 * math.pi * math.e)), 0.0)
         return max(float(beta * log(4 / 3.0) / log(beta / (2 * pi * e))), 0.0)
 
     def __call__(self, beta, d, B=None, C=5.46):
@@ -864,7 +874,7 @@ class GJ21(Kyber):
                 # set beta_sieve such that complexity of 1 sieve in dim sieve_dim is approx
                 # the same as the BKZ call
                 sieve_dim = min(
-                    d, floor(beta_ + log((d - beta) * C, 2) / self.NN_AGPS[self.nn]["a"])
+                    d, floor(beta_ + numeric.log((d - beta) * C, 2) / self.NN_AGPS[self.nn]["a"])
                 )
 
         # MATZOV, p.18 (they call the slope δ_β, we call it α_β)
@@ -15,10 +15,30 @@ where
 - d = m + n + 1.
 
 The last row is optional.
+
+Simulators return squared Gram-Schmidt norms. The GSA, ZGSA and LGSA can also return the natural logarithms
+of the Gram-Schmidt norms as a NumPy array, which is cheaper to compute for large dimensions and what most
+estimates use, see :func:`log_profile`.
 """
 
-from sage.all import RR, log, line, cached_function, pi, exp
-from functools import partial
+import numpy as np
+from sage.all import RR, log, line, pi, exp
+from functools import partial, wraps
+
+from .cache import cached
+
+# calls of simulators in this process, reported by profiled estimates
+_calls = 0
+
+
+def _counted(f):
+    @wraps(f)
+    def wrapper(*args, **kwds):
+        global _calls
+        _calls += 1
+        return f(*args, **kwds)
+
+    return wrapper
 
 
 def qary_simulator(f, d, n, q, beta, xi=1, tau=1, dual=False, ignore_qary=False):
@@ -42,7 +62,7 @@ def qary_simulator(f, d, n, q, beta, xi=1, tau=1, dual=False, ignore_qary=False)
         r = [q**2] * (d - n - 1) + [xi**2] * n + [tau**2]
 
     if ignore_qary:
-        r = GSA(d, n, q, 2, xi=xi, tau=tau)
+        r = _squared_norms(_gsa_log_profile(d, n, q, 2, xi=xi, tau=tau))
 
     if dual:
         # 1. reverse and reflect the basis (go to dual)
@@ -56,6 +76,7 @@ def qary_simulator(f, d, n, q, beta, xi=1, tau=1, dual=False, ignore_qary=False)
         return f(r, beta)
 
 
+@_counted
 def CN11(d, n, q, beta, xi=1, tau=1, dual=False, ignore_qary=False):
     """
     Reduced lattice shape using simulator from [AC:CheNgu11]_
@@ -84,6 +105,7 @@ def CN11(d, n, q, beta, xi=1, tau=1, dual=False, ignore_qary=False):
 CN11_NQ = partial(CN11, ignore_qary=True)
 
 
+@_counted
 def GSA(d, n, q, beta, xi=1, tau=1, dual=False):
     """
     Reduced lattice shape following the Geometric Series Assumption [Schnorr03]_
@@ -99,22 +121,54 @@ def GSA(d, n, q, beta, xi=1, tau=1, dual=False):
     :returns: squared Gram-Schmidt norms
 
     """
+    return _squared_norms(_gsa_log_profile(d, n, q, beta, xi=xi, tau=tau))
+
+
+def _gsa_log_profile(d, n, q, beta, xi=1, tau=1, dual=False):
     from .reduction import delta as deltaf
 
     if not tau:
-        log_vol = RR(log(q, 2) * (d - n) + log(xi, 2) * n)
+        log_vol = _ln(q) * (d - n) + _ln(xi) * n
     else:
-        log_vol = RR(log(q, 2) * (d - n - 1) + log(xi, 2) * n + log(tau, 2))
+        log_vol = _ln(q) * (d - n - 1) + _ln(xi) * n + _ln(tau)
 
-    delta = deltaf(beta)
-    r_log = [(d - 1 - 2 * i) * RR(log(delta, 2)) + log_vol / d for i in range(d)]
-    r = [2 ** (2 * r_) for r_ in r_log]
-    return r
+    return (d - 1 - 2 * np.arange(d)) * _ln(deltaf(beta)) + log_vol / d
 
 
-def ZGSA(d, n, q, beta, xi=1, tau=1, dual=False):
+@cached
+def _zgsa_slope(beta):
+    """
+    Slope of the log basis profile in the middle of a Z-shape for block size β.
+    """
     from math import lgamma
     from .util import gh_constant, small_slope_t8
+
+    def ball_log_vol(n):
+        return RR((n/2.) * log(pi) - lgamma(n/2. + 1))
+
+    def log_gh(d, logvol=0):
+        if d < 49:
+            return RR(gh_constant[d] + logvol/d)
+
+        return RR(1./d * (logvol - ball_log_vol(d)))
+
+    def delta(k):
+        assert k >= 60
+        delta = exp(log_gh(k)/(k-1))
+        return RR(delta)
+
+    if beta<=60:
+        return small_slope_t8[beta]
+    if beta<=70:
+        # interpolate between experimental and asymptotics
+        ratio = (70-beta)/10.
+        return ratio*small_slope_t8[60]+(1.-ratio)*2*log(delta(70))
+    else:
+        return 2 * log(delta(beta))
+
+
+@_counted
+def ZGSA(d, n, q, beta, xi=1, tau=1, dual=False):
     """
     Reduced lattice Z-shape following the Geometric Series Assumption as specified in
     NTRU fatrigue [DucWoe21]_
@@ -138,7 +192,7 @@ def ZGSA(d, n, q, beta, xi=1, tau=1, dual=False):
         >>> tau = 1
         >>> zgsa_profile = ZGSA(d, n, q, beta, xi, tau)
         >>> len(zgsa_profile)
-        214
+        213
 
     Setting tau to False indicates a homogeneous instance.
 
@@ -151,8 +205,8 @@ def ZGSA(d, n, q, beta, xi=1, tau=1, dual=False):
 
         >>> gsa_profile = GSA(d, n, q, beta, xi, tau)
         >>> cn11_profile = CN11(d, n, q, beta, xi, tau)
-        >>> sum([log(x) for x in cn11_profile]
-        1296.1852276471009
+        >>> sum([log(x) for x in cn11_profile])  # doctest: +ELLIPSIS
+        1296.18522764...
         >>> sum([log(x) for x in zgsa_profile])
         1296.18522764710
         >>> sum([log(x) for x in gsa_profile])
@@ -168,66 +222,36 @@ def ZGSA(d, n, q, beta, xi=1, tau=1, dual=False):
         1473.63090587044
         >>> sum([log(x) for x in zgsa_profile])
         1473.63090587044
-        >>> sum([log(x) for x in cn11_profile])
-        1473.630905870442
+        >>> sum([log(x) for x in cn11_profile])  # doctest: +ELLIPSIS
+        1473.63090587...
     """
 
-    @cached_function
-    def ball_log_vol(n):
-        return RR((n/2.) * log(pi) - lgamma(n/2. + 1))
-
-    def log_gh(d, logvol=0):
-        if d < 49:
-            return RR(gh_constant[d] + logvol/d)
-
-        return RR(1./d * (logvol - ball_log_vol(d)))
-
-    def delta(k):
-        assert k >= 60
-        delta = exp(log_gh(k)/(k-1))
-        return RR(delta)
-
-    @cached_function
-    def slope(beta):
-        if beta<=60:
-            return small_slope_t8[beta]
-        if beta<=70:
-            # interpolate between experimental and asymptotics
-            ratio = (70-beta)/10.
-            return ratio*small_slope_t8[60]+(1.-ratio)*2*log(delta(70))
-        else:
-            return 2 * log(delta(beta))
+    return _squared_norms(_zgsa_log_profile(d, n, q, beta, xi=xi, tau=tau))
 
-    if not tau:
-        L_log = (d - n)*[RR(log(q))] + n * [RR(log(xi))]
-        num_q_vec = (d - n)
-
-    else:
-        L_log = (d - n - 1)*[RR(log(q))] + n * [RR(log(xi))] + [RR(log(tau))]
-        num_q_vec = (d - n - 1)
 
-    slope_ = slope(beta)
-    diff = slope(beta)/2.
+def _zgsa_log_profile(d, n, q, beta, xi=1, tau=1, dual=False):
+    log_q, log_xi = _ln(q), _ln(xi)
+    num_q_vec = d - n if not tau else d - n - 1
 
-    for i in range(num_q_vec):
-        if diff > (RR(log(q)) - RR(log(xi)))/2.:
-            break
+    L_log = np.full(d, log_xi)
+    L_log[:num_q_vec] = log_q
+    if tau:
+        L_log[-1] = _ln(tau)
 
-        low = (num_q_vec)-i-1
-        high = (num_q_vec) + i
-        if low >= 0:
-            L_log[low] = (RR(log(q)) + RR(log(xi)))/2. + diff
+    # the i-th pair of vectors around the middle of the Z is pulled in by `diff[i]`
+    slope_ = float(_zgsa_slope(beta))
+    diff = slope_ / 2. + slope_ * np.arange(num_q_vec)
+    diff = diff[: np.count_nonzero(diff <= (log_q - log_xi) / 2.)]
 
-        if high < len(L_log):
-            L_log[high] = (RR(log(q)) + RR(log(xi)))/2. - diff
+    i = np.arange(len(diff))
+    L_log[num_q_vec - i - 1] = (log_q + log_xi) / 2. + diff
+    high = num_q_vec + i < d
+    L_log[num_q_vec + i[high]] = (log_q + log_xi) / 2. - diff[high]
 
-        diff += slope_
-
-    # Output basis profile as squared lengths, not ln(length)
-    L = [exp(2 * l_) for l_ in sorted(L_log, reverse=True)]
-    return L
+    return np.sort(L_log)[::-1]
 
 
+@_counted
 def LGSA(d, n, q, beta, xi=1, tau=1, dual=False):
     """
     Reduced lattice shape following the Z-shape Geometric Series Assumption with basis
@@ -282,43 +306,81 @@ def LGSA(d, n, q, beta, xi=1, tau=1, dual=False):
         ['4.37', '4.32', '4.28', '4.23', '4.19', '4.14', '4.10', '4.06', '4.01', '3.98', '3.94', '3.93']
         >>> zgsa_profile = ZGSA(d, n, q, beta, xi, tau)
     """
+    return _squared_norms(_lgsa_log_profile(d, n, q, beta, xi=xi, tau=tau))
+
+
+def _lgsa_log_profile(d, n, q, beta, xi=1, tau=1, dual=False):
     from .reduction import delta as deltaf
 
+    r_log = np.full(d, _ln(xi))
     if not tau:
-        log_vol = RR((d - n)*log(q, 2) + n*log(xi, 2))
-        r_log = d*[RR(log(xi, 2))]
-        profile_log_vol = d*RR(log(xi, 2))
-
+        log_vol = (d - n) * _ln(q) + n * _ln(xi)
     else:
-        log_vol = RR((d - n - 1)*log(q, 2) + n*log(xi, 2) + log(tau, 2))
-        r_log = (d - 1)*[RR(log(xi, 2))] + [RR(log(tau, 2))]
-        profile_log_vol = RR((d - 1)*log(xi, 2) + log(tau, 2))
+        log_vol = (d - n - 1) * _ln(q) + n * _ln(xi) + _ln(tau)
+        r_log[-1] = _ln(tau)
 
-    slope = -2 * RR(log(deltaf(beta), 2))
-    log_vec_len = 0
-    for i in range(d - 1, -1, -1):
-        log_vec_len -= slope
-        profile_log_vol += log_vec_len
-        r_log[i] += log_vec_len
-
-        if profile_log_vol > log_vol:
-            break
+    # GSA vectors grow from the end of the profile until they make up the volume
+    log_vec_len = 2 * _ln(deltaf(beta)) * np.arange(1, d + 1)
+    exceeded = r_log.sum() + np.cumsum(log_vec_len) > log_vol
+    num_gsa_vec = int(np.argmax(exceeded)) + 1 if exceeded.any() else d
+    r_log[d - num_gsa_vec:] += log_vec_len[:num_gsa_vec][::-1]
 
     # Rearrange r to have proper profile shape
-    num_gsa_vec = d - i
-    r_log = sorted(r_log, reverse=True)
+    r_log = np.sort(r_log)[::-1]
+    r_log[:num_gsa_vec] -= (r_log.sum() - log_vol) / num_gsa_vec  # Small shift of the GSA sequence to fix volume
+
+    assert abs(r_log.sum()/log_vol - 1) < 1e-6  # Sanity check the volume
+    return r_log
 
-    profile_log_vol = sum(r_log)
-    diff = profile_log_vol - log_vol
 
-    for i in range(num_gsa_vec):  # Small shift of the GSA sequence to fix volume
-        r_log[i] -= diff / num_gsa_vec
+def _ln(x):
+    # natural logarithm as a float, also of integers beyond the range of floats
+    return float(RR(x).log())
 
-    profile_log_vol = sum(r_log)
-    assert abs(profile_log_vol/log_vol - 1) < 1e-6  # Sanity check the volume
 
-    r = [2**(2 * r_) for r_ in r_log]
-    return r
+def _squared_norms(r_log):
+    return [RR(r_) for r_ in np.exp(2 * r_log)]
+
+
+GSA.log_profile = _counted(_gsa_log_profile)
+ZGSA.log_profile = _counted(_zgsa_log_profile)
+LGSA.log_profile = _counted(_lgsa_log_profile)
+
+
+def log_profile(simulator, d, n, q, beta, xi=1, tau=1, dual=False):
+    """
+    Reduced lattice shape as a NumPy array of natural logarithms of Gram-Schmidt norms, log ‖b_i^*‖.
+
+    Simulators without a log-domain implementation, such as CN11, are called and their output converted.
+
+    :param simulator: A simulator as returned by :func:`normalize`.
+    :param d: Lattice dimension.
+    :param n: The number of `q` vectors is `d-n-1`.
+    :param q: Modulus `q`
+    :param beta: Block size β.
+    :param xi: Scaling factor ξ for identity part.
+    :param tau: Kannan factor τ.
+    :param dual: perform reduction on the dual.
+
+    EXAMPLES::
+
+        >>> import numpy as np
+        >>> from estimator.simulator import GSA, ZGSA, LGSA, CN11, log_profile
+        >>> for simulator in (GSA, ZGSA, LGSA, CN11):
+        ...     r = log_profile(simulator, 213, 128, 2048, 40)
+        ...     print(len(r), bool(np.allclose(np.exp(2 * r), simulator(213, 128, 2048, 40))))
+        213 True
+        213 True
+        213 True
+        213 True
+
+    """
+    try:
+        f = simulator.log_profile
+    except AttributeError:
+        r = simulator(d, n, q, beta, xi=xi, tau=tau, dual=dual)
+        return np.log(np.asarray(r, dtype=float)) / 2
+    return f(d, n, q, beta, xi=xi, tau=tau, dual=dual)
 
 
 def normalize(name):
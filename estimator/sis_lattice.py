@@ -7,19 +7,22 @@ See :ref:`SIS Lattice Attacks` for an introduction what is available.
 """
 from functools import partial
 
-from sage.all import oo, sqrt, log, RR, floor, cached_function
+import numpy as np
+from sage.all import oo, sqrt, log, RR, floor
 from .reduction import beta as betaf
 from .reduction import cost as costf
 from .util import local_minimum
 from .cost import Cost
 from .sis_parameters import SISParameters
 from .simulator import normalize as simulator_normalize
+from .simulator import log_profile
 from .prob import gaussian_cdf
 from .prob import amplify as prob_amplify
 from .io import Logging
 from .conf import red_cost_model as red_cost_model_default
 from .conf import red_shape_model as red_shape_model_default
 from .conf import red_simulator as red_simulator_default
+from .cache import cached
 
 
 class SISLattice:
@@ -46,7 +49,7 @@ class SISLattice:
         return d
 
     @staticmethod
-    @cached_function
+    @cached
     def cost_euclidean(
         params: SISParameters,
         d=None,
@@ -78,7 +81,7 @@ class SISLattice:
         )
 
     @staticmethod
-    @cached_function
+    @cached
     def cost_infinity(
         beta: int,
         params: SISParameters,
@@ -116,7 +119,7 @@ class SISLattice:
         if d_ < beta:
             return Cost(rop=oo, mem=oo)
 
-        r = simulator(d=d_, n=d_ - params.n, q=params.q, beta=beta, xi=1, tau=False)
+        r = log_profile(simulator, d=d_, n=d_ - params.n, q=params.q, beta=beta, xi=1, tau=False)
 
         # Cost the sampling of short vectors.
         rho, cost_red, N, sieve_dim = red_cost_model.short_vectors(beta, d_)
@@ -124,27 +127,28 @@ class SISLattice:
 
         if RR(sqrt(d)) * params.length_bound <= params.q:  # Non-dilithium style analysis
             # Calculate expected vector length using approximation factor on the shortest vector from BKZ
-            vector_length = rho * sqrt(r[0])
+            vector_length = rho * float(np.exp(r[0]))
             # Find probability that all coordinates meet norm bound
             sigma = vector_length / sqrt(d_)
             log_trial_prob = RR(d_ * log(1 - 2 * gaussian_cdf(0, sigma, -params.length_bound), 2))
 
         else:  # Dilithium style analysis
             # Find first non-q-vector in r
-            if abs(sqrt(r[0]) - params.q) < 1e-8:  # q-vectors exist
-                idx_start = next(i for i, r_ in enumerate(r) if r_ < r[0])
+            if abs(np.exp(r[0]) - params.q) < 1e-8:  # q-vectors exist
+                idx_start = int(np.argmax(r < r[0]))
 
             else:
                 idx_start = 0
 
-            if abs(r[-1] - 1) < 1e-8:  # 1-vectors exist
+            if abs(np.exp(2 * r[-1]) - 1) < 1e-8:  # 1-vectors exist
                 # Find first 1 length graham-schmidt vector in r (Zone III)
-                idx_end = next((i - 1 for i, r_ in enumerate(r) if sqrt(r_) <= 1 + 1e-8), d_ - 1)
+                ones = np.flatnonzero(np.exp(r) <= 1 + 1e-8)
+                idx_end = int(ones[0]) - 1 if len(ones) else d_ - 1
 
             else:
                 idx_end = d_ - 1
 
-            vector_length = sqrt(r[idx_start])
+            vector_length = float(np.exp(r[idx_start]))
             gaussian_coords = max(idx_end - idx_start + 1, sieve_dim)
             sigma = vector_length / sqrt(gaussian_coords)
 
@@ -194,6 +198,7 @@ class SISLattice:
         red_cost_model=red_cost_model_default,
         d=None,
         log_level=5,
+        hint=None,
         **kwds,
     ):
         """
@@ -213,7 +218,7 @@ class SISLattice:
             **kwds,
         )
 
-        Logging.log("sis_infinity", log_level, f"H0: {repr(baseline_cost)}")
+        Logging.log("sis_infinity", log_level, lambda: f"H0: {repr(baseline_cost)}")
 
         f = partial(
             cls.cost_infinity,
@@ -228,7 +233,12 @@ class SISLattice:
 
         # step 1. optimize β
         with local_minimum(
-            40, baseline_cost["beta"] + 1, precision=2, log_level=log_level + 1
+            40,
+            baseline_cost["beta"] + 1,
+            precision=2,
+            log_level=log_level + 1,
+            params=params,
+            hint=None if hint is None else hint.get("beta"),
         ) as it:
             for beta in it:
                 it.update(f(beta))
@@ -236,7 +246,7 @@ class SISLattice:
                 it.update(f(beta))
             cost = it.y
 
-        Logging.log("sis_infinity", log_level, f"H1: {cost!r}")
+        Logging.log("sis_infinity", log_level, lambda: f"H1: {cost!r}")
         if cost is None:
             return Cost(rop=oo)
         return cost
@@ -248,6 +258,7 @@ class SISLattice:
         red_shape_model=red_shape_model_default,
         red_cost_model=red_cost_model_default,
         log_level=1,
+        hint=None,
         **kwds,
     ):
         """
@@ -255,6 +266,8 @@ class SISLattice:
 
         :param params: SIS parameters.
         :param zeta: Number of coefficients to set to 0 (ignore)
+        :param hint: A cost, e.g. for a neighbouring parameter set, whose ζ and β seed the searches (infinity norm
+            only).
         :return: A cost dictionary
 
         The returned cost dictionary has the following entries:
@@ -318,10 +331,13 @@ class SISLattice:
                 red_shape_model=red_shape_model,
                 red_cost_model=red_cost_model,
                 log_level=log_level + 1,
+                hint=hint,
             )
 
             if zeta is None:
-                with local_minimum(0, params.m, log_level=log_level) as it:
+                with local_minimum(
+                    0, params.m, log_level=log_level, params=params, hint=None if hint is None else hint.get("zeta")
+                ) as it:
                     for zeta in it:
                         it.update(
                             f(
@@ -1,24 +1,42 @@
+import atexit
 import itertools as it
+import json
+import math
+import numbers
+import os
+import signal
+import sys
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from copy import copy
 from multiprocessing import Pool
 from functools import partial
 from dataclasses import dataclass, field
-from typing import Any, Callable, NamedTuple
+from typing import Any, Callable, NamedTuple, Optional
+from weakref import ref
 
-from sage.all import ceil, floor, log, oo, RR, cached_function, zeta
+from sage.all import ceil, floor, log, oo, RR, zeta, AlarmInterrupt
 
+from .cost import Cost
 from .io import Logging
 from .lwe_parameters import LWEParameters
 from .sis_parameters import SISParameters
 from .pce_parameters import PCEParameters
 from .lip_parameters import LIPParameters
+from . import conf
 from .conf import max_n_cache
+from .cache import cached, suspend_memoization, ParameterKey
 
 
 def log2(x):
     return log(x, 2.0)
 
 
-@cached_function
+@cached
 def zeta_prime(x):
     h = 1e-5
     return RR((zeta(x+h) - zeta(x-h)))/(2*h)
@@ -47,15 +65,50 @@ small_slope_t8 = {2: 0.04473, 3: 0.04472, 4: 0.04402, 5: 0.04407, 6: 0.04334, 7:
 
 @dataclass
 class LazyEvaluation:
+    """
+    A table of ``f(0), …, f(max_n_cache)`` where each entry is computed on first access.
+
+    :param f: function to tabulate.
+    :param max_n_cache: largest admissible index.
+    :param maxsize: keep at most this many entries, evicting the least recently used one (``None`` for
+        no limit).
+
+    EXAMPLE::
+
+        >>> from estimator.util import LazyEvaluation
+        >>> T = LazyEvaluation(lambda i: i**2, 10, maxsize=2)
+        >>> T[3], T[4], T[5]
+        (9, 16, 25)
+        >>> sorted(T.eval)
+        [4, 5]
+        >>> T[11]
+        Traceback (most recent call last):
+        ...
+        IndexError: index 11 not in [0, 10]
+
+    """
+
     f: Callable
     max_n_cache: int
-    eval: list = field(default_factory=lambda: [])
+    maxsize: int = None
+    eval: OrderedDict = field(default_factory=OrderedDict)
 
     def __getitem__(self, key):
-        if not self.eval:
-            self.eval = [self.f(i) for i in range(self.max_n_cache + 1)]
+        try:
+            value = self.eval[key]
+            self.eval.move_to_end(key)
+            return value
+        except KeyError:
+            pass
+
+        if not 0 <= key <= self.max_n_cache:
+            raise IndexError(f"index {key} not in [0, {self.max_n_cache}]")
 
-        return self.eval[key]
+        value = self.f(key)
+        self.eval[key] = value
+        if self.maxsize is not None and len(self.eval) > self.maxsize:
+            self.eval.popitem(last=False)
+        return value
 
 
 zeta_precomputed = LazyEvaluation(lambda i: RR(zeta(i)) if i != 1 else RR(oo), max_n_cache)
@@ -84,6 +137,8 @@ class local_minimum_base:
         smallerf=lambda x, best: x <= best,
         suppress_bounds_warning=False,
         log_level=5,
+        params=None,
+        hint=None,
     ):
         """
         Create a fresh local minimum search context.
@@ -92,6 +147,10 @@ class local_minimum_base:
         :param stop:  end point (exclusive)
         :param smallerf: a function to decide if ``lhs`` is smaller than ``rhs``.
         :param suppress_bounds_warning: do not warn if a boundary is picked as optimal
+        :param params: the instance whose attack cost is minimised, if every value is such a cost, see
+            :func:`stop_below`
+        :param hint: a guess for the optimum, e.g. from a neighbouring parameter set. The search starts in a narrow
+            bracket around it, which is widened whenever the optimum lands on its edge.
 
         """
 
@@ -100,6 +159,7 @@ class local_minimum_base:
 
         self._suppress_bounds_warning = suppress_bounds_warning
         self._log_level = log_level
+        self._params = params
         self._start = start
         self._stop = stop - 1
         self._initial_bounds = Bounds(start, stop - 1)
@@ -111,6 +171,68 @@ class local_minimum_base:
         self._next_x = self._stop
         self._best = Bounds(None, None)
         self._all_x = set()
+        self._cut = False
+        self._seen = {}
+        self._hint_bracket = None
+        self._trace_id = None if _tracer is None else _tracer.open(self)
+        self._trace_t = None if _tracer is None else time.time()
+        if hint is not None:
+            self._focus(min(max(hint, self._initial_bounds.low), self._initial_bounds.high), 4)
+
+    def _focus(self, x, width):
+        """
+        Restart the search in ``[x - width, x + width]`` from ``x``.
+        """
+        self._start = max(x - width, self._initial_bounds.low)
+        self._stop = min(x + width, self._initial_bounds.high)
+        self._hint_bracket = Bounds(self._start, self._stop)
+        # treat x like the result of a long jump, i.e. probe both of its neighbours next
+        self._direction = 2
+        self._next_x = x
+        self._all_x = set()
+        self._replayed = set()
+
+    def _refocus(self):
+        """
+        Decide how a hinted search continues once it converged in its bracket.
+
+        If the optimum is on a plateau, e.g. the hint is where an attack fails, we cannot tell which way to go and
+        fall back to a full search. If it is at (or next to) an edge of the bracket that is not a bound, we widen the
+        bracket. Otherwise, we make sure both neighbours of the optimum were considered.
+        """
+        if self._hint_bracket is None or self._best.low is None:
+            return False
+        x, y = self._best
+        low, high = self._initial_bounds
+        if any(x_ in self._seen and self._smallerf(self._seen[x_], y) for x_ in (x - 1, x + 1)):
+            self._hint_bracket = None
+            self._start, self._stop = low, high
+            self._direction = -1
+            self._next_x = high
+            self._best = Bounds(None, None)
+            self._all_x = set()
+            return True
+        if (self._hint_bracket.low > low and x - self._hint_bracket.low <= 1) or (
+            self._hint_bracket.high < high and self._hint_bracket.high - x <= 1
+        ):
+            self._focus(x, 4 * (self._hint_bracket.high - self._hint_bracket.low))
+            return True
+        if any(low <= x_ <= high and x_ not in self._seen for x_ in (x - 1, x + 1)):
+            self._focus(x, 1)
+            return True
+        return False
+
+    def _replay(self):
+        """
+        Whether to feed the known value at ``self._next_x`` back into a hinted search instead of stopping.
+        """
+        if self._hint_bracket is None or self._next_x not in self._seen:
+            return False
+        state = (self._next_x, self._direction, self._start, self._stop)
+        if state in self._replayed:
+            return False
+        self._replayed.add(state)
+        return True
 
     def __enter__(self):
         """ """
@@ -118,7 +240,8 @@ class local_minimum_base:
 
     def __exit__(self, type, value, traceback):
         """ """
-        pass
+        if self._trace_id is not None:
+            _tracer.close(self)
 
     def __iter__(self):
         """ """
@@ -126,17 +249,32 @@ class local_minimum_base:
 
     def __next__(self):
 
-        if (
-            self._next_x is not None
-            and self._next_x not in self._all_x
-            and self._initial_bounds.low <= self._next_x <= self._initial_bounds.high
-        ):
-            # we've not been told to abort
-            # we're not looping
-            # we're in bounds
-            self._last_x = self._next_x
-            self._next_x = None
-            return self._last_x
+        while True:
+            if _past_deadline(self):
+                raise StopIteration
+
+            if (
+                self._next_x is not None
+                and (self._next_x not in self._all_x or self._replay())
+                and self._initial_bounds.low <= self._next_x <= self._initial_bounds.high
+            ):
+                # we've not been told to abort
+                # we're not looping
+                # we're in bounds
+                self._last_x = self._next_x
+                self._next_x = None
+                if self._last_x not in self._seen:
+                    if self._trace_id is not None:
+                        self._trace_t = time.time()
+                    return self._last_x
+                # we saw this point before, e.g. before the bracket was widened
+                self._step(self._seen[self._last_x])
+            elif self._hint_bracket is not None and self._next_x is not None and self._next_x not in self._all_x:
+                # we started off the hint instead of a bound, so we may probe beyond bounds: that is no better
+                self._last_x, self._next_x = self._next_x, None
+                self._advance(False)
+            elif not self._refocus():
+                break
 
         if self._best.low in self._initial_bounds and not self._suppress_bounds_warning:
             # We warn the user if the optimal solution is at the edge and thus possibly not optimal.
@@ -145,6 +283,8 @@ class local_minimum_base:
             )
             Logging.log("bins", self._log_level, msg)
 
+        if self._trace_id is not None:
+            _tracer.close(self)
         raise StopIteration
 
     @property
@@ -155,6 +295,13 @@ class local_minimum_base:
     def y(self):
         return self._best.high
 
+    @property
+    def bracket(self):
+        """
+        The interval the search is currently narrowed down to.
+        """
+        return Bounds(self._start, self._stop)
+
     def update(self, res):
         """
 
@@ -170,8 +317,25 @@ class local_minimum_base:
 
         """
 
-        Logging.log("bins", self._log_level, f"({self._last_x}, {repr(res)})")
+        global _evaluations
+        _evaluations += 1
+
+        Logging.log("bins", self._log_level, lambda: f"({self._last_x}, {repr(res)})")
+
+        if self._trace_id is not None:
+            self._trace_t = _tracer.record(self, self._external(self._last_x), res, self._trace_t)
+
+        self._seen.setdefault(self._last_x, res)
+
+        if self._params is not None:
+            check_target(self._params, res)
 
+        self._step(res)
+
+        if self._cut:
+            _flag_partial(self._best.high)
+
+    def _step(self, res):
         self._all_x.add(self._last_x)
 
         # We got nothing yet
@@ -179,10 +343,18 @@ class local_minimum_base:
             self._best = Bounds(self._last_x, res)
 
         # We found something better
-        if res is not False and self._smallerf(res, self._best.high):
+        better = res is not False and self._smallerf(res, self._best.high)
+        if better:
             # store it
             self._best = Bounds(self._last_x, res)
 
+        self._advance(better)
+
+    def _advance(self, better):
+        """
+        Pick the next point depending only on whether the last one was ``better``, see :meth:`run`.
+        """
+        if better:
             # if it's a result of a long jump figure out the next direction
             if abs(self._direction) != 1:
                 self._direction = -1
@@ -217,6 +389,86 @@ class local_minimum_base:
         if self._next_x == self._last_x:
             self._next_x = None
 
+    def _lookahead(self, depth):
+        """
+        The points the search may visit in the ``depth`` steps after the current one, in the order they are reached.
+        """
+        frontier, points = [self], []
+        for _ in range(depth):
+            successors = []
+            for search in frontier:
+                for better in (True, False):
+                    successor = copy(search)
+                    successor._all_x = search._all_x | {search._last_x}
+                    successor._advance(better)
+                    x = successor._next_x
+                    if x is None or x in successor._all_x or x in points:
+                        continue
+                    if not self._initial_bounds.low <= x <= self._initial_bounds.high:
+                        continue
+                    successor._last_x, successor._next_x = x, None
+                    successors.append(successor)
+                    points.append(x)
+            frontier = successors
+        return points
+
+    def _external(self, x):
+        return x
+
+    def run(self, f, param=None):
+        """
+        Update the search with ``f(x)`` for all points ``x`` it visits.
+
+        Inside :func:`speculative_search` the points the search may visit next are evaluated in parallel. The results
+        are consumed in the same order as without, so the outcome does not change. Evaluations in worker processes
+        run in the same :func:`prune_above`, :func:`stop_below`, :func:`search_deadline`, :func:`trace_searches` and
+        :func:`fast_numeric` contexts as the search.
+
+        :param f: cost function, which must be picklable when evaluated in a process pool.
+        :param param: pass ``x`` as this keyword argument to ``f``.
+        :returns: this search
+
+        EXAMPLE::
+
+            >>> from concurrent.futures import ThreadPoolExecutor
+            >>> from estimator.util import local_minimum, speculative_search
+            >>> f = lambda x: (x - 42)**2
+            >>> local_minimum(0, 100).run(f).x
+            42
+            >>> with speculative_search(ThreadPoolExecutor(4)):
+            ...     local_minimum(0, 100).run(f).x
+            42
+
+        """
+        context = _search_context()
+        if _speculation is None:
+            for x in self:
+                self._consume(*_speculate(f, x, context, param))
+            return self
+
+        executor, depth = _speculation
+        futures = {}
+        try:
+            for x in self:
+                for y in [x] + [self._external(z) for z in self._lookahead(depth)]:
+                    if y not in futures:
+                        futures[y] = executor.submit(_speculate, f, y, context, param)
+                self._consume(*futures[x].result())
+        finally:
+            for future in futures.values():
+                future.cancel()
+        return self
+
+    def _consume(self, res, worker):
+        if worker is not None:
+            # pass on what searches in a worker process recorded, as if they had run here
+            brackets, trace = worker
+            if _deadline_brackets is not None:
+                _deadline_brackets.extend(brackets)
+            if trace is not None and _tracer is not None:
+                _tracer.merge(*trace, parent=self._trace_id)
+        self.update(res)
+
 
 class local_minimum(local_minimum_base):
     """
@@ -240,6 +492,8 @@ class local_minimum(local_minimum_base):
         smallerf=lambda x, best: x <= best,
         suppress_bounds_warning=False,
         log_level=5,
+        params=None,
+        hint=None,
     ):
         """
         Create a fresh local minimum search context.
@@ -249,22 +503,50 @@ class local_minimum(local_minimum_base):
         :param precision: only consider every ``precision``-th value in the main loop
         :param smallerf: a function to decide if ``lhs`` is smaller than ``rhs``.
         :param suppress_bounds_warning: do not warn if a boundary is picked as optimal
+        :param params: the instance whose attack cost is minimised, if every value is such a cost, see
+            :func:`stop_below`
+        :param hint: a guess for the optimum, see :class:`local_minimum_base`.
+
+        EXAMPLE::
+
+            >>> from estimator.util import local_minimum
+            >>> def f(x):
+            ...     seen.append(x)
+            ...     return (x - 42)**2
+            >>> seen = []
+            >>> local_minimum(0, 100).run(f).x, len(seen)
+            (42, 11)
+            >>> seen = []
+            >>> local_minimum(0, 100, hint=40).run(f).x, len(seen)
+            (42, 5)
+            >>> seen = []
+            >>> local_minimum(0, 100, hint=10).run(f).x, len(seen)
+            (42, 16)
 
         """
         self._precision = precision
         self._orig_bounds = (start, stop)
         start = ceil(start / precision)
         stop = floor(stop / precision)
-        local_minimum_base.__init__(self, start, stop, smallerf, suppress_bounds_warning, log_level)
+        if hint is not None:
+            hint = round(hint / precision)
+        local_minimum_base.__init__(self, start, stop, smallerf, suppress_bounds_warning, log_level, params, hint)
 
     def __next__(self):
         x = local_minimum_base.__next__(self)
         return x * self._precision
 
+    def _external(self, x):
+        return x * self._precision
+
     @property
     def x(self):
         return self._best.low * self._precision
 
+    @property
+    def bracket(self):
+        return Bounds(self._start * self._precision, self._stop * self._precision)
+
     @property
     def neighborhood(self):
         """
@@ -318,19 +600,24 @@ class early_abort_range:
         self._last_x = None
         self._next_x = self._start
         self._best = Bounds(None, None)
+        self._cut = False
+        self._trace_id = None if _tracer is None else _tracer.open(self)
+        self._trace_t = None if _tracer is None else time.time()
 
     def __iter__(self):
         """ """
         return self
 
     def __next__(self):
-        if self._next_x is None:
-            raise StopIteration
-        if self._next_x >= self._stop:
+        if self._next_x is None or self._next_x >= self._stop or _past_deadline(self):
+            if self._trace_id is not None:
+                _tracer.close(self)
             raise StopIteration
 
         self._last_x = self._next_x
         self._next_x += self._step
+        if self._trace_id is not None:
+            self._trace_t = time.time()
         return self._last_x, self
 
     @property
@@ -341,9 +628,19 @@ class early_abort_range:
     def y(self):
         return self._best.high
 
+    @property
+    def bracket(self):
+        return Bounds(self._next_x, self._stop)
+
     def update(self, res):
         """ """
-        Logging.log("lins", self._log_level, f"({self._last_x}, {repr(res)})")
+        global _evaluations
+        _evaluations += 1
+
+        Logging.log("lins", self._log_level, lambda: f"({self._last_x}, {repr(res)})")
+
+        if self._trace_id is not None:
+            self._trace_t = _tracer.record(self, self._last_x, res, self._trace_t)
 
         if self._best.low is None:
             self._best = Bounds(self._last_x, res)
@@ -356,6 +653,9 @@ class early_abort_range:
         else:
             self._next_x = None
 
+        if self._cut:
+            _flag_partial(self._best.high)
+
 
 def binary_search(
     f, start, stop, param, step=1, smallerf=lambda x, best: x <= best, log_level=5, *args, **kwds
@@ -384,9 +684,721 @@ def binary_search(
         return it.y
 
 
-def _batch_estimatef(f, x, log_level=0, f_repr=None, catch_exceptions=True):
+class PatternSearch(NamedTuple):
+    x: dict
+    y: Any
+    evaluations: int
+
+
+def pattern_search(f, bounds, start=None, step=None, smallerf=lambda x, best: x <= best, log_level=5, params=None):
+    """
+    Minimise ``f`` over all integer points in a box jointly, instead of nesting one search per dimension.
+
+    Starting from ``start`` we move to the first neighbour ``±step`` along some coordinate that is strictly better.
+    If no neighbour is better, all steps are halved, and we stop once no neighbour at distance one is better. Every
+    point is evaluated at most once.
+
+    :param f: function called with one keyword argument per dimension, returning e.g. a cost. Points it cannot
+        handle, e.g. because dimensions depend on each other, should be reported as ``Cost(rop=oo)``.
+    :param bounds: a dictionary mapping dimension names to ``(start, stop)`` (stop exclusive).
+    :param start: a dictionary mapping dimension names to a warm start, by default the middle of the box.
+    :param step: a dictionary mapping dimension names to initial step sizes, by default a quarter of the range.
+    :param smallerf: a function to decide if ``lhs`` is smaller than ``rhs``.
+    :param log_level: logging level.
+    :param params: the instance whose attack cost is minimised, see :func:`stop_below`.
+    :returns: ``(x, y, evaluations)`` with ``x`` a dictionary.
+
+    EXAMPLE::
+
+        >>> from estimator.util import pattern_search
+        >>> f = lambda a, b: (a - 7)**2 + (b - 3)**2 + a * b
+        >>> pattern_search(f, {"a": (0, 100), "b": (0, 100)})
+        PatternSearch(x={'a': 7, 'b': 0}, y=9, evaluations=23)
+        >>> pattern_search(f, {"a": (0, 100), "b": (0, 100)}, start={"a": 6, "b": 1}, step={"a": 1, "b": 1})
+        PatternSearch(x={'a': 7, 'b': 0}, y=9, evaluations=7)
+
+    """
+    start = start or {}
+    step = step or {}
+    x = {k: min(max(start.get(k, (lo + hi - 1) // 2), lo), hi - 1) for k, (lo, hi) in bounds.items()}
+    steps = {k: max(step.get(k, (hi - lo) // 4), 1) for k, (lo, hi) in bounds.items()}
+    seen = {}
+
+    def evaluate(x):
+        key = tuple(x.values())
+        if key not in seen:
+            seen[key] = f(**x)
+            Logging.log("pats", log_level, lambda: f"({x}, {seen[key]!r})")
+            if params is not None:
+                check_target(params, seen[key])
+        return seen[key]
+
+    def better(y, best):
+        return y is not False and smallerf(y, best) and not smallerf(best, y)
+
+    y = evaluate(x)
+    while True:
+        moved = False
+        for k, (lo, hi) in bounds.items():
+            for sign in (1, -1):
+                x_ = dict(x)
+                x_[k] = min(max(x[k] + sign * steps[k], lo), hi - 1)
+                if x_ == x:
+                    continue
+                y_ = evaluate(x_)
+                if better(y_, y):
+                    x, y, moved = x_, y_, True
+                    break
+        if moved:
+            continue
+        if all(s == 1 for s in steps.values()):
+            break
+        steps = {k: max(s // 2, 1) for k, s in steps.items()}
+
+    return PatternSearch(x, y, len(seen))
+
+
+class SearchEvent(NamedTuple):
+    """
+    One evaluation of a search, see :func:`trace_searches`.
+    """
+
+    search: int
+    parent: Optional[int]
+    label: str
+    x: Any
+    cost: Any
+    start: float
+    time: float
+
+
+def _jsonable(v):
+    if v is None or isinstance(v, (bool, str)):
+        return v
+    if isinstance(v, Mapping):
+        return {str(k): _jsonable(w) for k, w in v.items()}
+    if isinstance(v, numbers.Integral):
+        return int(v)
+    if isinstance(v, (tuple, list)):
+        return [_jsonable(w) for w in v]
+    try:
+        v = float(v)
+    except (TypeError, ValueError):
+        return str(v)
+    return v if math.isfinite(v) else str(v)
+
+
+def _open_for_writing(f):
+    if isinstance(f, (str, os.PathLike)):
+        return open(f, "w")
+    return contextmanager(lambda: (yield f))()
+
+
+class SearchTrace:
+    """
+    Searches and their evaluations recorded by :func:`trace_searches`.
+
+    - ``searches`` maps search ids to ``(parent, label, created)``, where ``parent`` is the id of the search that
+      was running when this one was created and ``label`` names the function that created it.
+    - ``events`` lists :class:`SearchEvent` in the order they happened.
+    """
+
+    def __init__(self):
+        self.searches = {}
+        self.events = []
+        self._ids = it.count()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        # searches abandoned without being exhausted, e.g. by ``break``, are gone once no longer referenced
+        self._local.stack = [search for search in self._local.stack if search() is not None]
+        return self._local.stack
+
+    def open(self, search):
+        """
+        Register ``search`` and return its id.
+        """
+        stack = self._stack()
+        parent = stack[-1]()._trace_id if stack else None
+        frame = sys._getframe(1)
+        while frame.f_back is not None and frame.f_code.co_filename == __file__:
+            frame = frame.f_back
+        label = getattr(frame.f_code, "co_qualname", frame.f_code.co_name)
+        with self._lock:
+            search_id = next(self._ids)
+            self.searches[search_id] = (parent, label, time.time())
+        stack.append(ref(search))
+        return search_id
+
+    def close(self, search):
+        """
+        Forget ``search`` and all searches it started as candidate parents.
+        """
+        stack = self._stack()
+        for i, search_ in enumerate(stack):
+            if search_() is search:
+                del stack[i:]
+                break
+
+    def record(self, search, x, cost, start):
+        parent, label, _ = self.searches[search._trace_id]
+        event = SearchEvent(search._trace_id, parent, label, x, cost, start, time.time())
+        with self._lock:
+            self.events.append(event)
+        return event.time
+
+    def merge(self, searches, events, parent=None):
+        """
+        Add ``searches`` and ``events`` recorded by another trace, e.g. in a worker process, with new ids.
+
+        :param searches: ``searches`` of the other trace.
+        :param events: ``events`` of the other trace.
+        :param parent: id of the search that started the outermost searches of the other trace.
+
+        """
+        with self._lock:
+            ids = {search_id: next(self._ids) for search_id in searches}
+            ids[None] = parent
+            for search_id, (parent_, label, created) in searches.items():
+                self.searches[ids[search_id]] = (ids[parent_], label, created)
+            for event in events:
+                self.events.append(event._replace(search=ids[event.search], parent=ids[event.parent]))
+
+    def summary(self):
+        """
+        Return a dictionary mapping labels to the number of searches, the number of evaluations and the time spent
+        evaluating, which includes the time spent in searches started while evaluating.
+        """
+        summary = {}
+        for search_id, (parent, label, _) in self.searches.items():
+            entry = summary.setdefault(label, {"searches": 0, "evaluations": 0, "time": 0.0})
+            entry["searches"] += 1
+        for event in self.events:
+            entry = summary[event.label]
+            entry["evaluations"] += 1
+            entry["time"] += event.time - event.start
+        return summary
+
+    def to_jsonl(self, f):
+        """
+        Write one JSON object per evaluation to ``f``, a path or a file.
+        """
+        with _open_for_writing(f) as fh:
+            for event in self.events:
+                fh.write(json.dumps(_jsonable(event._asdict())) + "\n")
+
+    def to_chrome(self, f):
+        """
+        Write all searches and evaluations to ``f``, a path or a file, in the Chrome trace event format, to be
+        viewed in e.g. ``chrome://tracing`` or Perfetto. Evaluations are nested in the evaluations they were run in.
+        """
+        t0 = min([created for _, _, created in self.searches.values()], default=0.0)
+
+        def us(t):
+            return round((t - t0) * 10**6)
+
+        last = {}
+        for event in self.events:
+            last[event.search] = event.time
+
+        trace = []
+        for search_id, (parent, label, created) in self.searches.items():
+            trace.append(
+                {
+                    "name": label,
+                    "cat": "search",
+                    "ph": "X",
+                    "ts": us(created),
+                    "dur": us(last.get(search_id, created)) - us(created),
+                    "pid": os.getpid(),
+                    "tid": 0,
+                    "args": {"search": search_id, "parent": parent},
+                }
+            )
+        for event in self.events:
+            trace.append(
+                {
+                    "name": f"{event.label}({_jsonable(event.x)})",
+                    "cat": "evaluation",
+                    "ph": "X",
+                    "ts": us(event.start),
+                    "dur": us(event.time) - us(event.start),
+                    "pid": os.getpid(),
+                    "tid": 0,
+                    "args": _jsonable({"search": event.search, "x": event.x, "cost": event.cost}),
+                }
+            )
+        with _open_for_writing(f) as fh:
+            json.dump({"traceEvents": trace}, fh)
+
+
+_tracer = None
+
+
+@contextmanager
+def trace_searches():
+    """
+    Record every point evaluated by :class:`local_minimum` and :class:`early_abort_range` searches.
+
+    Only searches in this process are recorded, e.g. run :func:`batch_estimate` with ``jobs=1``.
+
+    EXAMPLE::
+
+        >>> from estimator.util import local_minimum, trace_searches
+        >>> def f(x):
+        ...     with local_minimum(0, 10) as it:
+        ...         return it.run(lambda y: (y - 3)**2 + (x - 42)**2).y
+        >>> with trace_searches() as trace:
+        ...     _ = local_minimum(0, 100).run(f)
+        >>> trace.searches[0][:2], trace.searches[1][:2]
+        ((None, '<module>'), (0, 'f'))
+        >>> [(event.search, event.x, event.cost) for event in trace.events[5:8]]
+        [(1, 3, 3249), (0, 99, 3249), (2, 9, 100)]
+        >>> {k: v["evaluations"] for k, v in trace.summary().items()}
+        {'<module>': 11, 'f': 66}
+
+    Traces can be written with :meth:`SearchTrace.to_jsonl` and :meth:`SearchTrace.to_chrome`.
+
+    """
+    global _tracer
+    previous, _tracer = _tracer, SearchTrace()
     try:
-        y = f(x)
+        yield _tracer
+    finally:
+        _tracer = previous
+
+
+_pruning_threshold = oo
+
+
+def pruning_threshold():
+    """
+    The cost above which cost functions may give up, see :func:`prune_above`.
+    """
+    return _pruning_threshold
+
+
+_speculation = None
+
+
+def _search_context():
+    return os.getpid(), _pruning_threshold, _target, _deadline, _tracer is not None, conf.fast_numeric
+
+
+def _speculate(f, x, context, param=None):
+    """
+    Return ``f(x)`` and, if evaluated in a worker process, the brackets and trace its searches recorded.
+    """
+    pid, rop, target, deadline, traced, fast = context
+    if pid == os.getpid():
+        # threads share the search contexts of this process
+        return (f(x) if param is None else f(**{param: x})), None
+
+    # worker processes do not share the search contexts of the process running the search, so we enter them again
+    with ExitStack() as stack:
+        stack.enter_context(prune_above(rop))
+        stack.enter_context(stop_below(*target) if target is not None else stop_below(None))
+        brackets = stack.enter_context(search_deadline(deadline))
+        trace = stack.enter_context(trace_searches()) if traced else None
+        stack.enter_context(fast_numeric(fast))
+        res = f(x) if param is None else f(**{param: x})
+    return res, (brackets, None if trace is None else (trace.searches, trace.events))
+
+
+@contextmanager
+def speculative_search(executor, depth=2):
+    """
+    Let searches evaluate the points they may visit next in parallel, see :meth:`local_minimum_base.run`.
+
+    A search knows which point it visits next depending on whether the current point improves on the best one so
+    far. Looking ahead ``depth`` steps evaluates up to `2^{depth+1}-2` points in advance, of which ``depth`` are
+    used. This speeds up single, expensive searches, such as over β in the primal hybrid attack, with several cores.
+
+    This is opt-in only: ``jobs`` of :func:`batch_estimate` and e.g. ``LWE.estimate`` runs different estimates in
+    parallel, but never searches within one estimate.
+
+    :param executor: a :class:`concurrent.futures.Executor` or a number of worker processes.
+    :param depth: number of steps to look ahead.
+
+    EXAMPLE::
+
+        >>> from estimator import *
+        >>> from estimator.util import speculative_search
+        >>> params = schemes.Kyber512.updated(Xs=ND.SparseTernary(512, 16))
+        >>> with speculative_search(2):
+        ...     LWE.primal_hybrid(params, mitm=False, babai=False, zeta=256)
+        rop: ≈2^91.5, red: ≈2^90.7, svp: ≈2^90.2, β: 178, η: 21, ζ: 256, |S|: ≈2^56.6, d: 530, ...
+
+    """
+    global _speculation
+    owned = None
+    if not isinstance(executor, Executor):
+        executor = owned = ProcessPoolExecutor(executor)
+    previous, _speculation = _speculation, (executor, depth)
+    try:
+        yield executor
+    finally:
+        _speculation = previous
+        if owned is not None:
+            owned.shutdown(cancel_futures=True)
+
+
+@contextmanager
+def prune_above(rop):
+    """
+    Allow cost functions to give up on parameters once they know the cost is at least ``rop``.
+
+    Such cost functions return a lower bound on the cost flagged with ``status="pruned"`` instead of the cost. This
+    is useful when only costs below ``rop`` are of interest, e.g. when ``rop`` is the cost of the cheapest attack
+    found so far. Pass ``oo`` to suspend pruning.
+
+    :param rop: cost threshold.
+
+    EXAMPLE::
+
+        >>> from estimator.util import prune_above, pruning_threshold
+        >>> with prune_above(2**128):
+        ...     pruning_threshold() == 2**128
+        True
+        >>> pruning_threshold()
+        +Infinity
+
+    """
+    global _pruning_threshold
+    previous, _pruning_threshold = _pruning_threshold, rop
+    try:
+        yield
+    finally:
+        _pruning_threshold = previous
+
+
+_target = None
+
+
+class TargetReached(Exception):
+    """
+    Raised by a search on the parameters passed to :func:`stop_below` once it finds a cost below the target.
+    """
+
+    def __init__(self, cost):
+        super().__init__(cost)
+        self.cost = cost
+
+
+def _below_target(params, cost, rop):
+    if not isinstance(cost, Cost) or "status" in cost or not bool(cost["rop"] < rop):
+        return False
+    # an attack asking for more samples than we have is no witness
+    return not bool(cost.get("m", 0) > getattr(params, "m", oo))
+
+
+def check_target(params, cost):
+    """
+    Raise :class:`TargetReached` if ``cost`` for solving ``params`` is below the target set by :func:`stop_below`.
+
+    :param params: the instance ``cost`` is for.
+    :param cost: cost of an attack on ``params``.
+
+    """
+    if _target is None:
+        return
+    rop, target_params = _target
+    if params is not target_params and params != target_params:
+        return
+    if _below_target(params, cost, rop):
+        raise TargetReached(cost)
+
+
+@contextmanager
+def stop_below(rop, params=None):
+    """
+    Abort searches on ``params`` as soon as they find a cost below ``rop``.
+
+    This answers "is this instance at least this hard?" without optimising attacks that are already known to do
+    better. Searches on ``params`` raise :class:`TargetReached` carrying the cheaper cost. Searches on other
+    instances, e.g. after guessing some secret coordinates, are not affected. Pass ``None`` to suspend the target.
+
+    :param rop: cost threshold.
+    :param params: the instance to decide.
+
+    EXAMPLE::
+
+        >>> from estimator import *
+        >>> from estimator.util import stop_below, TargetReached
+        >>> try:
+        ...     with stop_below(2**150, schemes.Kyber512):
+        ...         LWE.primal_usvp(schemes.Kyber512, red_shape_model="gsa")
+        ... except TargetReached as e:
+        ...     e.cost["rop"] < 2**150
+        True
+
+    """
+    global _target
+    previous, _target = _target, None if rop is None else (rop, params)
+    try:
+        yield
+    finally:
+        _target = previous
+
+
+@contextmanager
+def suspend_bounds():
+    """
+    Suspend :func:`prune_above` and :func:`stop_below`, e.g. to compute baselines which bound a search.
+    """
+    with prune_above(oo), stop_below(None):
+        yield
+
+
+class Decision(NamedTuple):
+    """
+    Answer to "is this instance at least this hard?", see :func:`decide`.
+
+    It is truthy iff the instance is secure. Otherwise, ``attack`` and ``cost`` are a witness that it is not, else
+    they are the cheapest attack found.
+    """
+
+    secure: bool
+    attack: str
+    cost: Cost
+
+    def __bool__(self):
+        return self.secure
+
+
+def decide(params, algorithms, rop, log_level=1, catch_exceptions=True):
+    """
+    Decide if all ``algorithms`` cost at least ``rop`` on ``params``.
+
+    Algorithms are run one after another and their searches stop as soon as a cost below ``rop`` is found, after which
+    the remaining algorithms are skipped.
+
+    :param params: problem parameters.
+    :param algorithms: a dictionary mapping names to cost functions, cheapest expected first.
+    :param rop: cost threshold.
+    :param log_level: logging level.
+    :param catch_exceptions: When an estimate fails, just print a warning.
+    :returns: a :class:`Decision`
+
+    """
+    best = Decision(True, None, Cost(rop=oo))
+    for name, f in algorithms.items():
+        try:
+            with stop_below(rop, params):
+                cost = f(params)
+        except TargetReached as e:
+            cost = e.cost
+        except Exception as e:
+            if catch_exceptions:
+                print(f"Algorithm {f_name(f)} on {params} failed with {e}")
+                continue
+            raise e
+
+        Logging.log("batch", log_level, lambda: f"{name}: {cost!r}")
+
+        if _below_target(params, cost, rop):
+            return Decision(False, name, cost)
+        if cost is not None and "status" not in cost and cost["rop"] < best.cost["rop"]:
+            best = Decision(True, name, cost)
+    return best
+
+
+_deadline = None
+_deadline_brackets = None
+
+
+@contextmanager
+def search_deadline(at):
+    """
+    Make searches return the best result found so far once ``time.time()`` passes ``at``.
+
+    Every search still continues until it found a sane, finite cost, so that it has a result. The best cost of a
+    search that was cut short is flagged with ``status="partial"`` and nothing is memoized while the deadline is set.
+    The context yields a list to which the brackets of such searches are appended, innermost first.
+
+    :param at: a point in time as returned by ``time.time()`` or ``None`` for no deadline.
+
+    EXAMPLE::
+
+        >>> import time
+        >>> from estimator import *
+        >>> from estimator.util import search_deadline
+        >>> with search_deadline(time.time()) as brackets:
+        ...     cost = LWE.primal_usvp(schemes.Kyber512.updated(n=576), red_shape_model="gsa")
+        >>> cost["status"], brackets
+        ('partial', [Bounds(low=40, high=1145)])
+
+    """
+    global _deadline, _deadline_brackets
+    previous = _deadline, _deadline_brackets
+    _deadline, _deadline_brackets = at, []
+    try:
+        if at is None:
+            yield _deadline_brackets
+        else:
+            # a result assembled from searches that were cut short need not be flagged itself
+            with suspend_memoization():
+                yield _deadline_brackets
+    finally:
+        _deadline, _deadline_brackets = previous
+
+
+def _past_deadline(search):
+    if _deadline is None or search._best.low is None or time.time() <= _deadline:
+        return False
+    best = search._best.high
+    if isinstance(best, Cost):
+        sane = bool(best["rop"] < oo) and all(best.get(k, 0) <= best.get("d", oo) for k in ("beta", "eta"))
+        if not sane:
+            return False  # keep going until we have something to show
+    if not search._cut:
+        search._cut = True
+        _deadline_brackets.append(search.bracket)
+    _flag_partial(best)
+    return True
+
+
+def _flag_partial(cost):
+    if isinstance(cost, Cost) and "status" not in cost:
+        cost["status"] = "partial"
+
+
+@contextmanager
+def time_limit(seconds):
+    """
+    Raise ``AlarmInterrupt`` if the body runs for longer than ``seconds``.
+
+    Like Sage's ``alarm()`` this also interrupts long computations in compiled code. Since it relies on signals,
+    the limit only applies in the main thread; elsewhere, and if ``seconds`` is ``None``, the body runs without a
+    limit.
+
+    :param seconds: wall time limit in seconds.
+
+    EXAMPLE::
+
+        >>> from sage.all import AlarmInterrupt
+        >>> from estimator.util import time_limit
+        >>> try:
+        ...     with time_limit(0.1):
+        ...         while True:
+        ...             pass
+        ... except AlarmInterrupt:
+        ...     print("timeout")
+        timeout
+
+    """
+    if not seconds or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def unraisablehook(unraisable):
+        if not isinstance(unraisable.exc_value, AlarmInterrupt):
+            previous_unraisablehook(unraisable)
+
+    # Sage ignores exceptions raised in some callbacks from compiled code, so we keep interrupting until one
+    # gets through
+    previous_unraisablehook, sys.unraisablehook = sys.unraisablehook, unraisablehook
+    deadline = time.monotonic() + seconds
+    signal.setitimer(signal.ITIMER_REAL, seconds, 0.05)
+    try:
+        yield
+    except SystemError as e:
+        if time.monotonic() >= deadline:
+            # compiled code that was interrupted may fail like this instead of passing the interrupt on
+            raise AlarmInterrupt() from e
+        raise
+    finally:
+        # Cancel the timer with SIGALRM blocked and discard an alarm that is still pending. Python cannot restore
+        # the handler Sage installs in compiled code, so we can't simply ignore the signal in the meantime.
+        mask = signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGALRM})
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.sigtimedwait({signal.SIGALRM}, 0)
+        signal.pthread_sigmask(signal.SIG_SETMASK, mask)
+        sys.unraisablehook = previous_unraisablehook
+
+
+@contextmanager
+def fast_numeric(enabled=True):
+    """
+    Evaluate cost formulas in double precision instead of Sage's exact arithmetic, see :mod:`estimator.numeric`.
+
+    This sets ``conf.fast_numeric``, which can also be set directly to change the default. Results are memoized
+    separately for either mode and estimates run by :func:`batch_estimate` use the mode it was called in.
+
+    :param enabled: use double precision.
+
+    EXAMPLE::
+
+        >>> from estimator import *
+        >>> from estimator.util import fast_numeric
+        >>> with fast_numeric():
+        ...     LWE.primal_usvp(schemes.Kyber512)
+        rop: ≈2^143.8, red: ≈2^143.8, δ: 1.003941, β: 406, d: 998, tag: usvp
+
+    """
+    previous, conf.fast_numeric = conf.fast_numeric, enabled
+    try:
+        yield
+    finally:
+        conf.fast_numeric = previous
+
+
+# points evaluated by searches in this process, reported by profiled estimates
+_evaluations = 0
+
+
+class Profile(NamedTuple):
+    """
+    Resources spent on an estimate, attached to its cost by :func:`batch_estimate` with ``profile=True``.
+
+    Evaluations, cache hits and simulator calls are counted in the process running the estimate, so work handed to
+    other processes by :func:`speculative_search` is not included.
+    """
+
+    wall: float  # seconds
+    cpu: float  # seconds of CPU time of the process
+    evaluations: int  # points evaluated by searches
+    cache_hits: int  # results reused from memoized functions
+    simulations: int  # calls to simulators of the reduced basis shape
+
+    @classmethod
+    def start(cls):
+        """
+        Return the current values of all counters.
+        """
+        from . import cache, simulator
+
+        return cls(time.perf_counter(), time.process_time(), _evaluations, cache._hits, simulator._calls)
+
+    def stop(self):
+        """
+        Return the resources spent since :meth:`start` returned ``self``.
+        """
+        return Profile(*(now - then for now, then in zip(Profile.start(), self)))
+
+
+def _profiled(y, start):
+    if start is not None and y is not None:
+        y["profile"] = start.stop()
+    return y
+
+
+def _batch_estimatef(
+    f, x, log_level=0, f_repr=None, catch_exceptions=True, timeout=None, deadline=None, profile=False, fast=False
+):
+    if f_repr is None:
+        f_repr = repr(f)
+
+    start = Profile.start() if profile else None
+    try:
+        with time_limit(timeout), search_deadline(deadline) as brackets, fast_numeric(fast):
+            y = f(x)
+    except AlarmInterrupt:
+        Logging.log("batch", log_level, lambda: f"{f_repr} on {x} timed out after {timeout}s")
+        return _profiled(Cost(rop=oo, status="timeout"), start)
     except Exception as e:
         if catch_exceptions:
             print(f"Algorithm {f_repr} on {x} failed with {e}")
@@ -394,14 +1406,63 @@ def _batch_estimatef(f, x, log_level=0, f_repr=None, catch_exceptions=True):
         else:
             raise e
 
-    if f_repr is None:
-        f_repr = repr(f)
+    if brackets and y is not None:
+        Logging.log("batch", log_level, lambda: f"{f_repr} on {x} hit the deadline")
+        _flag_partial(y)  # a lower bound from prune_above stays "pruned", the bracket still says it was cut short
+        y["bracket"] = tuple(brackets[-1])
 
-    Logging.log("batch", log_level, f"f: {f_repr}")
-    Logging.log("batch", log_level, f"x: {x}")
-    Logging.log("batch", log_level, f"f(x): {y!r}")
+    Logging.log("batch", log_level, lambda: f"f: {f_repr}")
+    Logging.log("batch", log_level, lambda: f"x: {x}")
+    Logging.log("batch", log_level, lambda: f"f(x): {y!r}")
 
-    return y
+    return _profiled(y, start)
+
+
+def _batch_estimatef_timed(i, task):
+    start = time.perf_counter()
+    y = _batch_estimatef(*task)
+    return i, y, time.perf_counter() - start
+
+
+def _star_batch_estimatef_timed(args):
+    return _batch_estimatef_timed(*args)
+
+
+# algorithm name → moving average of wall times in seconds, used to start slow tasks first
+_runtimes = {}
+_runtime_smoothing = 0.5
+
+
+def _algorithm_name(f):
+    # the same algorithm with different options, e.g. reduction cost models, shares one entry
+    while isinstance(f, partial):
+        f = f.func
+    return f_name(f)
+
+
+def _record_runtime(name, elapsed):
+    if name in _runtimes:
+        elapsed = (1 - _runtime_smoothing) * _runtimes[name] + _runtime_smoothing * elapsed
+    _runtimes[name] = elapsed
+
+
+def _schedule(tasks):
+    """
+    Indices of ``tasks``, slowest expected first. Algorithms we have not timed yet come first.
+
+    EXAMPLE::
+
+        >>> from estimator.util import Task, _schedule, _record_runtime
+        >>> def fast(x): pass
+        >>> def slow(x): pass
+        >>> def new(x): pass
+        >>> tasks = [Task(partial(f, log_level=1), None, 0, f.__name__, True) for f in (fast, slow, new)]
+        >>> _record_runtime("fast", 0.1); _record_runtime("slow", 10.0)
+        >>> _schedule(tasks)
+        [2, 1, 0]
+
+    """
+    return sorted(range(len(tasks)), key=lambda i: -_runtimes.get(_algorithm_name(tasks[i].f), float("inf")))
 
 
 def f_name(f):
@@ -417,21 +1478,246 @@ class Task(NamedTuple):
     log_level: int
     f_name: str
     catch_exceptions: bool
+    timeout: float = None
+    deadline: float = None
+    profile: bool = False
+    fast_numeric: bool = False
 
 
 @dataclass(frozen=True)
 class TaskResults:
+    """
+    Results of :func:`batch_estimate`, indexed by parameters.
+
+    EXAMPLE::
+
+        >>> from estimator import LWE
+        >>> from estimator.schemes import Kyber512, Kyber768
+        >>> res = batch_estimate([Kyber512, Kyber768], [LWE.primal_usvp, LWE.primal_bdd], log_level=1)
+        >>> res[Kyber768]["primal_bdd"]
+        rop: ≈2^201.0, red: ≈2^200.0, svp: ≈2^200.0, β: 606, η: 641, d: 1425, tag: bdd
+        >>> res[Kyber768.updated(tag="Kyber")]
+        {}
+        >>> list(res.by_algorithm())
+        ['primal_usvp', 'primal_bdd']
+        >>> [params.tag for params in res.by_params()]
+        ['Kyber 512', 'Kyber 768']
+        >>> for row in res.to_table(): print(row[0].tag, row[1], f"{float(log(row[2], 2)):.1f}")
+        Kyber 512 primal_usvp 143.8
+        Kyber 768 primal_usvp 204.9
+        Kyber 512 primal_bdd 140.3
+        Kyber 768 primal_bdd 201.0
+
+    """
+
     _map: dict
+    # canonical parameter key → [(task, result), …], where equivalent parameter sets share a bucket
+    _index: dict = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        index = {}
+        for task, result in self._map.items():
+            index.setdefault(ParameterKey.of(task.x), []).append((task, result))
+        object.__setattr__(self, "_index", index)
 
     def __getitem__(self, params):
         return {
             task.f_name: result
-            for task, result in self._map.items()
+            for task, result in self._index.get(ParameterKey.of(params), ())
             if task.x == params and result is not None
         }
 
+    def by_algorithm(self):
+        """
+        Return a dictionary mapping algorithm names to lists of ``(params, cost)`` pairs.
+        """
+        res = {}
+        for task, result in self._map.items():
+            if result is not None:
+                res.setdefault(task.f_name, []).append((task.x, result))
+        return res
+
+    def by_params(self):
+        """
+        Return a dictionary mapping parameters to dictionaries mapping algorithm names to costs.
+        """
+        res = {}
+        for task, result in self._map.items():
+            if result is not None:
+                res.setdefault(task.x, {})[task.f_name] = result
+        return res
+
+    def to_table(self, keys=("rop",)):
+        """
+        Return a list of ``(params, algorithm name, cost[key], …)`` rows, with ``None`` for missing keys.
+
+        :param keys: entries of each cost to include.
+        """
+        return [
+            (task.x, task.f_name) + tuple(result.get(key) for key in keys)
+            for task, result in self._map.items()
+            if result is not None
+        ]
+
+
+_pool = None
+_pool_jobs = None
+_pool_pid = None
+
+
+def _pool_initializer():
+    # pay for importing the estimator once per worker, not in the first task
+    from . import lwe, ntru, sis  # noqa
+
+
+def get_pool(jobs):
+    """
+    Return a process pool with ``jobs`` workers.
+
+    The pool is kept alive between calls, so workers keep their memoized values. It is replaced when a different
+    number of workers is requested and shut down when the interpreter exits.
+
+    :param jobs: number of worker processes.
+
+    EXAMPLE::
+
+        >>> from estimator.util import get_pool, shutdown_pool
+        >>> get_pool(2) is get_pool(2)
+        True
+        >>> shutdown_pool()
+
+    """
+    global _pool, _pool_jobs, _pool_pid
+
+    if _pool is not None and _pool_pid != os.getpid():
+        # inherited from our parent, which owns it
+        _pool = None
+    if _pool is not None and _pool_jobs != jobs:
+        shutdown_pool()
+    if _pool is None:
+        _pool = Pool(jobs, initializer=_pool_initializer)
+        _pool_jobs, _pool_pid = jobs, os.getpid()
+    return _pool
+
+
+def shutdown_pool(wait=True):
+    """
+    Shut down the pool returned by :func:`get_pool`.
+
+    :param wait: wait for the workers to finish their current tasks, otherwise terminate them.
+    """
+    global _pool
+
+    if _pool is None or _pool_pid != os.getpid():
+        _pool = None
+        return
+    if wait:
+        _pool.close()
+    else:
+        _pool.terminate()
+    _pool.join()
+    _pool = None
+
+
+atexit.register(shutdown_pool)
+
+
+def _batch_tasks(params, algorithm, log_level, catch_exceptions, timeout, deadline, profile=False, **kwds):
+    if isinstance(params, LWEParameters) or isinstance(params, SISParameters) or isinstance(params, PCEParameters) or isinstance(params, LIPParameters):
+        params = (params,)
+    algorithm = tuple(algorithm) if hasattr(algorithm, "__iter__") else (algorithm,)
+    if not isinstance(timeout, dict):
+        timeout = dict.fromkeys(map(f_name, algorithm), timeout)
+    if deadline is not None:
+        deadline = time.time() + deadline
+    return [
+        Task(
+            partial(f, **kwds),
+            x,
+            log_level,
+            f_name(f),
+            catch_exceptions,
+            timeout.get(f_name(f)),
+            deadline,
+            profile,
+            conf.fast_numeric,
+        )
+        for f, x in it.product(algorithm, params)
+    ]
+
+
+def _batch_run(tasks, jobs, pool):
+    """
+    Yield ``(i, result)`` for each of ``tasks`` as it completes.
+    """
+    if pool is None and jobs == 1:
+        for i, task in enumerate(tasks):
+            _, y, elapsed = _batch_estimatef_timed(i, task)
+            _record_runtime(_algorithm_name(task.f), elapsed)
+            yield i, y
+        return
+
+    # hand out one task at a time, slowest first, so that no worker idles while another works through a backlog
+    scheduled = [(i, tasks[i]) for i in _schedule(tasks)]
+    try:
+        for i, y, elapsed in (pool or get_pool(jobs)).imap_unordered(
+            _star_batch_estimatef_timed, scheduled, chunksize=1
+        ):
+            _record_runtime(_algorithm_name(tasks[i].f), elapsed)
+            yield i, y
+    except BaseException:
+        if pool is None:
+            # don't leave workers running abandoned tasks
+            shutdown_pool(wait=False)
+        raise
+
+
+def batch_estimate_iter(
+    params,
+    algorithm,
+    jobs=1,
+    log_level=0,
+    catch_exceptions=True,
+    timeout=None,
+    deadline=None,
+    pool=None,
+    profile=False,
+    **kwds,
+):
+    """
+    Run estimates for all algorithms for all parameters, yielding ``(params, algorithm_name, cost)`` for each
+    estimate as soon as it completes.
+
+    Parameters are as for :func:`batch_estimate`. The cost is ``None`` if the estimate failed and exceptions
+    are caught. With multiple jobs, results arrive in order of completion. Closing the iterator early
+    terminates the shared worker pool, cancelling the remaining estimates.
+
+    Example::
+
+        >>> from estimator import LWE
+        >>> from estimator.schemes import Kyber512
+        >>> for params, name, cost in batch_estimate_iter(Kyber512, [LWE.primal_usvp], log_level=1):
+        ...     print(f"{params.tag}, {name}: {cost!r}")
+        Kyber 512, primal_usvp: rop: ≈2^143.8, red: ≈2^143.8, δ: 1.003941, β: 406, d: 998, tag: usvp
 
-def batch_estimate(params, algorithm, jobs=1, log_level=0, catch_exceptions=True, **kwds):
+    """
+    tasks = _batch_tasks(params, algorithm, log_level, catch_exceptions, timeout, deadline, profile, **kwds)
+    for i, y in _batch_run(tasks, jobs, pool):
+        yield tasks[i].x, tasks[i].f_name, y
+
+
+def batch_estimate(
+    params,
+    algorithm,
+    jobs=1,
+    log_level=0,
+    catch_exceptions=True,
+    timeout=None,
+    deadline=None,
+    pool=None,
+    profile=False,
+    **kwds,
+):
     """
     Run estimates for all algorithms for all parameters.
 
@@ -440,6 +1726,15 @@ def batch_estimate(params, algorithm, jobs=1, log_level=0, catch_exceptions=True
     :param jobs: Use multiple threads in parallel.
     :param log_level:
     :param catch_exceptions: When an estimate fails, just print a warning.
+    :param timeout: Give up on an estimate after this many seconds, returning a cost with ``rop=oo`` and
+        ``status="timeout"``. Either a number or a dictionary mapping algorithm names to seconds.
+    :param deadline: Stop optimising after this many seconds and return the best costs found so far. Costs of
+        searches that were cut short are flagged with ``status="partial"`` and the ``bracket`` the search was
+        narrowed down to.
+    :param pool: Run tasks in this ``multiprocessing`` pool instead of the one shared between calls with ``jobs``
+        workers.
+    :param profile: Attach a :class:`Profile` of the resources each estimate took to its cost as ``profile``,
+        e.g. to find out which algorithms are expensive to estimate. It is not printed with the cost.
 
     Example::
 
@@ -447,22 +1742,23 @@ def batch_estimate(params, algorithm, jobs=1, log_level=0, catch_exceptions=True
         >>> from estimator.schemes import Kyber512
         >>> _ = batch_estimate(Kyber512, [LWE.primal_usvp, LWE.primal_bdd])
         >>> _ = batch_estimate(Kyber512, [LWE.primal_usvp, LWE.primal_bdd], jobs=2)
+        >>> res = batch_estimate(Kyber512, [LWE.primal_usvp, LWE.primal_bdd], timeout={"primal_bdd": 0.001})
+        >>> res[Kyber512]["primal_bdd"]
+        rop: ≈2^inf, status: timeout
+        >>> res = batch_estimate(Kyber512, LWE.dual, deadline=0)
+        >>> res[Kyber512]["dual"]["status"]
+        'partial'
+        >>> res = batch_estimate(Kyber512, [LWE.primal_usvp, LWE.primal_bdd], jobs=2, profile=True)
+        >>> res[Kyber512]["primal_usvp"]
+        rop: ≈2^143.8, red: ≈2^143.8, δ: 1.003941, β: 406, d: 998, tag: usvp
+        >>> profile = res[Kyber512]["primal_usvp"]["profile"]
+        >>> profile.wall > 0 and profile.cpu > 0
+        True
 
     """
-
-    if isinstance(params, LWEParameters) or isinstance(params, SISParameters) or isinstance(params, PCEParameters) or isinstance(params, LIPParameters):
-        params = (params,)
-    if not hasattr(algorithm, "__iter__"):
-        algorithm = (algorithm,)
-    tasks = [
-        Task(partial(f, **kwds), x, log_level, f_name(f), catch_exceptions)
-        for f, x in it.product(algorithm, params)
-    ]
-
-    if jobs == 1:
-        results = [_batch_estimatef(*task) for task in tasks]
-    else:
-        with Pool(jobs) as pool:
-            results = pool.starmap(_batch_estimatef, tasks)
+    tasks = _batch_tasks(params, algorithm, log_level, catch_exceptions, timeout, deadline, profile, **kwds)
+    results = [None] * len(tasks)
+    for i, y in _batch_run(tasks, jobs, pool):
+        results[i] = y
 
     return TaskResults(dict(zip(tasks, results)))